@@ -0,0 +1,103 @@
+import argparse
+import json
+import math
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+from PIL import Image, ImageDraw
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from wcoh_arc_text import draw_text_in_arc, glyph_atlas  # noqa: E402
+from wcoh_font_cache import get_font  # noqa: E402
+
+TEXT = "엘지유플러스에서힘찬도약을함께응원합니다"
+
+
+def draw_text_in_arc_legacy(image, text, font, center, radius, start_angle, end_angle, fill='black', stroke_fill='blue', stroke_width=0):
+    # 글리프 아틀라스 도입 전의 10배 슈퍼샘플링 경로 (비교 기준)
+    angle_range = end_angle - start_angle
+    angle_step = (angle_range / (len(text) - 1) if len(text) > 1 else 1)
+    current_angle = start_angle
+    for char in text:
+        char_bbox = font.getbbox(char)
+        char_width = char_bbox[2] - char_bbox[0]
+        char_height = char_bbox[3] - char_bbox[1]
+        angle = math.radians(current_angle)
+        super_sampling_multiplier = 10
+        char_image = Image.new("RGBA", (char_width * super_sampling_multiplier, char_height * super_sampling_multiplier), (0, 0, 0, 0))
+        char_draw = ImageDraw.Draw(char_image)
+        super_sampling_font = get_font(font.path, font.size * super_sampling_multiplier)
+        char_draw.text((0, 0), char, font=super_sampling_font, fill=fill, stroke_fill=stroke_fill, stroke_width=stroke_width)
+        rotated_char_image = char_image.rotate(current_angle - 90, expand=1, resample=Image.Resampling.BICUBIC)
+        new_size = (int(rotated_char_image.width / 10), int(rotated_char_image.height / 10))
+        rotated_char_image_resized = rotated_char_image.resize(new_size, resample=Image.Resampling.BICUBIC)
+        x = center[0] + radius * math.cos(angle) - rotated_char_image_resized.size[0] / 2
+        y = center[1] + radius * math.sin(angle) - rotated_char_image_resized.size[1] / 2
+        image.paste(rotated_char_image_resized, (int(x), int(y)), rotated_char_image_resized)
+        current_angle += angle_step
+
+
+def render(fn, font, size, radius, **kwargs):
+    image = Image.new("RGBA", size, "blue")
+    center = (size[0] // 2, radius + font.size)
+    fn(image, TEXT, font, center, radius, 180, 360, fill="red", stroke_fill="blue", **kwargs)
+    return image
+
+
+def timed(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        samples.append(time.perf_counter() - start)
+    return result, samples
+
+
+def summary(samples):
+    return {
+        "mean_ms": statistics.fmean(samples) * 1000,
+        "min_ms": min(samples) * 1000,
+        "max_ms": max(samples) * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="draw_text_in_arc: 10배 슈퍼샘플링 vs 글리프 아틀라스")
+    parser.add_argument("--font", default=str(ROOT / "Jalnan2TTF.ttf"))
+    parser.add_argument("--font-size", type=int, default=200)
+    parser.add_argument("--radius", type=int, default=900)
+    parser.add_argument("--supersample", type=int, default=4)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    font = get_font(args.font, args.font_size)
+    size = (args.radius * 2 + args.font_size * 4, args.radius + args.font_size * 4)
+
+    legacy_image, legacy = timed(lambda: render(draw_text_in_arc_legacy, font, size, args.radius), args.repeat)
+    glyph_atlas.clear()
+    cold_image, cold = timed(lambda: render(draw_text_in_arc, font, size, args.radius, supersample=args.supersample), 1)
+    atlas_image, warm = timed(lambda: render(draw_text_in_arc, font, size, args.radius, supersample=args.supersample), args.repeat)
+
+    diff = np.abs(np.asarray(legacy_image, dtype=np.int16) - np.asarray(atlas_image, dtype=np.int16))
+    report = {
+        "text": TEXT,
+        "characters": len(TEXT),
+        "font_size": args.font_size,
+        "supersample": args.supersample,
+        "legacy": summary(legacy),
+        "atlas_cold": summary(cold),
+        "atlas_warm": summary(warm),
+        "speedup_warm": statistics.fmean(legacy) / statistics.fmean(warm),
+        "mean_abs_diff": float(diff.mean()),
+        "atlas": glyph_atlas.stats(),
+    }
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
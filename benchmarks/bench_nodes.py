@@ -0,0 +1,283 @@
+import argparse
+import importlib.util
+import itertools
+import json
+import os
+import platform
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import PIL
+import torch
+from PIL import Image
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from wcoh_arc_text import glyph_atlas  # noqa: E402
+from wcoh_convert import pil2tensor  # noqa: E402
+from wcoh_coverage import coverage_cache  # noqa: E402
+from wcoh_executor import BACKENDS, render_workers  # noqa: E402
+from wcoh_shaping import shape_cache  # noqa: E402
+from wcoh_text_layout import layout_cache  # noqa: E402
+from wcoh_text_sprite import sprite_cache  # noqa: E402
+
+TEXTS = {
+    "hangul": "유플러스에서 힘찬 도약을 응원합니다.",
+    "latin": "Cheering for your big leap forward.",
+}
+IMAGE_SIZES = [512, 1024, 2048, 4096]
+BATCH_SIZES = [1, 4, 16]
+FONT_SIZES = [40, 200]
+FOLDER_SIZES = [5, 500, 5000]
+QUICK = {
+    "image_sizes": [512, 1024],
+    "batch_sizes": [1, 4],
+    "font_sizes": [40],
+    "folder_sizes": [5, 500],
+}
+
+
+def load_module(filename: str, name: str):
+    spec = importlib.util.spec_from_file_location(name, ROOT / filename)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def clear_render_caches():
+    glyph_atlas.clear()
+    sprite_cache.clear()
+    layout_cache.clear()
+    shape_cache.clear()
+    coverage_cache.clear()
+
+
+def reset_peak_rss():
+    # Linux 에서는 VmHWM 을 초기화해 케이스별 최대 RSS 를 잰다
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+    except OSError:
+        pass
+
+
+def peak_rss_mb() -> float:
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def percentile(samples, q):
+    return float(np.percentile(np.asarray(samples) * 1000.0, q))
+
+
+def measure(fn, images_per_call: int, repeat: int, warmup: int = 1) -> dict:
+    for _ in range(warmup):
+        fn()
+    reset_peak_rss()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    total = sum(samples)
+    return {
+        "repeat": repeat,
+        "p50_ms": percentile(samples, 50),
+        "p90_ms": percentile(samples, 90),
+        "p99_ms": percentile(samples, 99),
+        "mean_ms": total / repeat * 1000.0,
+        "throughput_ips": images_per_call * repeat / total if total else 0.0,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+class Fixtures:
+    def __init__(self, workdir: Path):
+        self.workdir = workdir
+        self.fonts = {path.stem: path.as_posix() for path in sorted(ROOT.glob("*.ttf"))}
+        self.backgrounds = sorted((ROOT / "winter").glob("*.png"))
+        with Image.open(ROOT / "LG_U+_CI.svg.png") as logo:
+            self.logo = pil2tensor(logo)
+        self._frames = {}
+        self._folders = {}
+
+    def frames(self, size: int, batch: int) -> torch.Tensor:
+        key = (size, batch)
+        if key not in self._frames:
+            with Image.open(self.backgrounds[0]) as background:
+                frame = pil2tensor(background.convert("RGB").resize((size, size), Image.Resampling.BICUBIC))
+            self._frames[key] = frame.expand(batch, -1, -1, -1).contiguous()
+        return self._frames[key]
+
+    def folder(self, count: int) -> Path:
+        # winter/ 이미지를 심볼릭 링크로 늘려 큰 폴더를 흉내낸다
+        if count not in self._folders:
+            folder = self.workdir / f"folder_{count}"
+            folder.mkdir()
+            for index, source in zip(range(count), itertools.cycle(self.backgrounds)):
+                (folder / f"{index:06d}{source.suffix}").symlink_to(source)
+            self._folders[count] = folder
+        return self._folders[count]
+
+
+def text_to_image_cases(modules, fixtures, matrix):
+    node_cls = modules["wcoh_compy"].wcoh
+    node_cls.fonts.update(fixtures.fonts)
+    node = node_cls()
+    for size, font_size, (script, text), arc in itertools.product(matrix["image_sizes"], matrix["font_sizes"], TEXTS.items(), [False, True]):
+        params = {"size": size, "font_size": font_size, "script": script, "arc": arc}
+        yield "wcoh.text_to_image", params, 1, lambda text=text, font_size=font_size, size=size, arc=arc: node.text_to_image(
+            text, "Jalnan2TTF", "center", 0, font_size, size, size, "red", 2, "blue", 0, 0, 10,
+            arc_text=arc, arc_radius=max(size // 3, 1))
+
+
+def add_text_cases(modules, fixtures, matrix):
+    for module_name, class_name, extra in [("wcoh_text_on_image", "wcoh_text_on_image", ()),
+                                           ("wcoh_text_on_image_team_name", "wcoh_text_on_image_team_name", (5,))]:
+        node_cls = getattr(modules[module_name], class_name)
+        node_cls.fonts.update(fixtures.fonts)
+        node = node_cls()
+        for size, batch, font_size, (script, text) in itertools.product(matrix["image_sizes"], matrix["batch_sizes"], matrix["font_sizes"], TEXTS.items()):
+            frames = fixtures.frames(size, batch)
+            params = {"size": size, "batch": batch, "font_size": font_size, "script": script}
+            # 프레임마다 다른 캡션 (이름표처럼) 이라 렌더링 워커 수에 따른 확장성을 볼 수 있다
+            texts = [f"{text} {index + 1}" for index in range(batch)]
+            yield f"{class_name}.add_text_to_image", params, batch, lambda node=node, frames=frames, texts=texts, font_size=font_size, size=size: node.add_text_to_image(
+                frames, texts, "LG_Smart_UI-SemiBold", font_size, "white", "black", 2, 2, "CENTER", size // 2, *extra)
+
+
+def text_blocks_cases(modules, fixtures, matrix):
+    node_cls = modules["wcoh_text_blocks"].wcoh_text_blocks
+    node_cls.fonts.update(fixtures.fonts)
+    node = node_cls()
+    for size, batch, font_size, block_count in itertools.product(matrix["image_sizes"], matrix["batch_sizes"], matrix["font_sizes"], [1, 4]):
+        frames = fixtures.frames(size, batch)
+        texts = list(TEXTS.values())
+        blocks = json.dumps([{"text": texts[index % len(texts)], "font_size": font_size, "position_y": size * (index + 1) // (block_count + 1)}
+                             for index in range(block_count)], ensure_ascii=False)
+        params = {"size": size, "batch": batch, "font_size": font_size, "blocks": block_count}
+        yield "wcoh_text_blocks.add_text_blocks", params, batch, lambda frames=frames, blocks=blocks: node.add_text_blocks(
+            frames, blocks, "LG_Smart_UI-SemiBold")
+
+
+def overlay_cases(modules, fixtures, matrix):
+    node = modules["wcoh_mask_overlay"].wcoh_mask_overlay()
+    for size, batch, mode in itertools.product(matrix["image_sizes"], matrix["batch_sizes"], ["pil", "torch"]):
+        frames = fixtures.frames(size, batch)
+        params = {"size": size, "batch": batch, "composite_mode": mode}
+        yield "wcoh_mask_overlay.apply_mask_overlay", params, batch, lambda frames=frames, mode=mode: node.apply_mask_overlay(
+            frames, fixtures.logo, 0.5, -20, 40, mode)
+
+
+def random_image_cases(modules, fixtures, matrix):
+    node = modules["wcoh_random_image"].wcoh_random_image()
+    for folder_size, count in itertools.product(matrix["folder_sizes"], [1, 8]):
+        folder = fixtures.folder(folder_size).as_posix()
+        params = {"folder_size": folder_size, "count": count}
+        seeds = itertools.count()
+        yield "wcoh_random_image.select_random_image", params, count, lambda folder=folder, count=count, seeds=seeds: node.select_random_image(
+            folder, next(seeds), count=count, width=512, height=512)
+
+
+SUITES = {
+    "text_to_image": text_to_image_cases,
+    "add_text_to_image": add_text_cases,
+    "text_blocks": text_blocks_cases,
+    "mask_overlay": overlay_cases,
+    "random_image": random_image_cases,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="wcoh 노드 핫패스 벤치마크 (ComfyUI 없이 노드 클래스를 직접 실행)")
+    parser.add_argument("--suite", action="append", choices=sorted(SUITES), help="실행할 스위트 (기본: 전체)")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--quick", action="store_true", help="작은 매트릭스로 빠르게 실행")
+    parser.add_argument("--filter", default="", help="노드 이름에 포함된 문자열로 케이스 제한")
+    parser.add_argument("--output", type=Path, help="JSON 결과 파일 (기본: stdout)")
+    parser.add_argument("--workers", default="", help="쉼표로 구분한 렌더링 워커 수 (예: 1,2,4,8). 값마다 전체 케이스를 반복")
+    parser.add_argument("--backend", choices=BACKENDS, help="렌더링 워커 백엔드 (기본: WCOH_RENDER_BACKEND)")
+    parser.add_argument("--cold", action="store_true", help="호출마다 글리프/스프라이트/레이아웃 캐시를 비워 래스터화 비용까지 측정")
+    args = parser.parse_args()
+
+    matrix = QUICK if args.quick else {
+        "image_sizes": IMAGE_SIZES,
+        "batch_sizes": BATCH_SIZES,
+        "font_sizes": FONT_SIZES,
+        "folder_sizes": FOLDER_SIZES,
+    }
+    modules = {
+        "wcoh_compy": load_module("wcoh_compy.py", "wcoh_compy"),
+        "wcoh_text_on_image": load_module("wcoh_text_on_image.py", "wcoh_text_on_image"),
+        "wcoh_text_on_image_team_name": load_module("wcoh_text_on_image(team&name).py", "wcoh_text_on_image_team_name"),
+        "wcoh_text_blocks": load_module("wcoh_text_blocks.py", "wcoh_text_blocks"),
+        "wcoh_mask_overlay": load_module("wcoh_mask_overlay.py", "wcoh_mask_overlay"),
+        "wcoh_random_image": load_module("wcoh_random_image.py", "wcoh_random_image"),
+    }
+
+    workdir = Path(tempfile.mkdtemp(prefix="wcoh_bench_"))
+    results = []
+    try:
+        fixtures = Fixtures(workdir)
+        worker_counts = [int(value) for value in args.workers.split(",") if value.strip()] or [None]
+        for suite, workers in itertools.product(args.suite or sorted(SUITES), worker_counts):
+            for name, params, images_per_call, fn in SUITES[suite](modules, fixtures, matrix):
+                if args.filter and args.filter not in name:
+                    continue
+                if workers is not None:
+                    params = {**params, "workers": workers}
+                if args.cold:
+                    fn = lambda fn=fn: (clear_render_caches(), fn())
+                with render_workers(workers, args.backend):
+                    stats = measure(fn, images_per_call, args.repeat)
+                results.append({"suite": suite, "node": name, "params": params, **stats})
+                print(f"{name} {params} p50={stats['p50_ms']:.1f}ms", file=sys.stderr)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "git_revision": git_revision(),
+            "python": platform.python_version(),
+            "torch": torch.__version__,
+            "pillow": PIL.__version__,
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "torch_threads": torch.get_num_threads(),
+            "repeat": args.repeat,
+            "quick": args.quick,
+            "cold": args.cold,
+            "render_backend": args.backend,
+        },
+        "results": results,
+    }
+    output = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        args.output.write_text(output, encoding="utf-8")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
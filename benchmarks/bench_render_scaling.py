@@ -0,0 +1,108 @@
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import PIL
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+os.environ.setdefault("WCOH_WARMUP", "0")
+
+from wcoh_arc_text import arc_glyphs, glyph_atlas  # noqa: E402
+from wcoh_coverage import coverage_cache  # noqa: E402
+from wcoh_executor import BACKENDS, render_workers, shutdown  # noqa: E402
+from wcoh_font_cache import get_font  # noqa: E402
+from wcoh_shaping import shape_cache  # noqa: E402
+from wcoh_text_sprite import sprite_cache  # noqa: E402
+
+TEXT = "유플러스에서 힘찬 도약을 응원합니다"
+ARC_TEXT = "엘지유플러스에서힘찬도약을함께응원합니다"
+
+
+def caption_case(font, captions: int):
+    # FreeType 래스터화가 대부분인 경로: 서로 다른 캡션 스프라이트를 캐시 없이 한 번에 요청
+    requests = [(f"{TEXT} {index}", font, "white", "black", 2, 2, 0) for index in range(captions)]
+
+    def run():
+        sprite_cache.clear()
+        coverage_cache.clear()
+        shape_cache.clear()
+        sprite_cache.get_many(requests)
+    return run
+
+
+def arc_case(font, supersample: int):
+    # resize/transform/paste 가 대부분인 경로: 아틀라스는 미리 채워 두고 글자별 회전만 측정
+    glyph_atlas.warm(font, list(ARC_TEXT), 4, supersample)
+
+    def run():
+        arc_glyphs(ARC_TEXT, font, (1200, 1200), 900, 180, 360, fill="red", stroke_fill="blue",
+                   stroke_width=4, supersample=supersample)
+    return run
+
+
+def measure(fn, repeat: int) -> float:
+    fn()  # 풀 생성/워커 폰트 로드는 제외
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="렌더링 워커 수/백엔드별 확장성 (캡션 래스터화 vs 원호 글자 변환)")
+    parser.add_argument("--font", default=str(ROOT / "LG_Smart_UI-SemiBold.ttf"))
+    parser.add_argument("--font-size", type=int, default=120)
+    parser.add_argument("--captions", type=int, default=64)
+    parser.add_argument("--supersample", type=int, default=4)
+    parser.add_argument("--workers", default="1,2,4,8", help="쉼표로 구분한 워커 수")
+    parser.add_argument("--backend", action="append", choices=BACKENDS, help="측정할 백엔드 (기본: 전체)")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    font = get_font(args.font, args.font_size)
+    # arc_glyphs 의 글자 변환은 항상 스레드 백엔드를 쓰므로 워커 수만 바꿔 측정
+    cases = {
+        "caption": (caption_case(font, args.captions), args.backend or BACKENDS),
+        "arc": (arc_case(font, args.supersample), ["thread"]),
+    }
+    worker_counts = [int(value) for value in args.workers.split(",") if value.strip()]
+    results = []
+    try:
+        for case, (fn, backends) in cases.items():
+            with render_workers(1, "serial"):
+                baseline = measure(fn, args.repeat)
+            for backend in backends:
+                for workers in worker_counts:
+                    with render_workers(workers, backend):
+                        p50 = measure(fn, args.repeat)
+                    results.append({"case": case, "backend": backend, "workers": workers, "p50_ms": p50,
+                                    "speedup": baseline / p50})
+                    print(f"{case} {backend} x{workers} p50={p50:.1f}ms speedup={baseline / p50:.2f}", file=sys.stderr)
+    finally:
+        shutdown()
+
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "pillow": PIL.__version__,
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "font_size": args.font_size,
+            "captions": args.captions,
+            "repeat": args.repeat,
+        },
+        "results": results,
+    }
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,6 @@
+import os
+import sys
+
+# 노드 모듈은 ComfyUI 밖에서는 최상위 모듈로 import 된다 (benchmarks 와 같은 방식)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("WCOH_WARMUP", "0")
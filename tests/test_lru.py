@@ -0,0 +1,38 @@
+from wcoh_lru import LRUCache
+
+
+def test_evicts_least_recently_used_by_bytes():
+    cache = LRUCache(max_bytes=10, cost=len)
+    cache.put("a", "aaaa")
+    cache.put("b", "bbbb")
+    assert cache.get("a") == "aaaa"  # a 가 가장 최근 사용이 된다
+    cache.put("c", "cccc")
+    assert "b" not in cache and "a" in cache and "c" in cache
+    assert cache.stats()["bytes"] == 8
+    # 상한보다 큰 값은 보관하지 않는다
+    assert not cache.put("d", "d" * 11)
+    assert cache.get("d") is None
+
+
+def test_keep_newest_holds_one_oversized_entry():
+    cache = LRUCache(max_entries=4, max_bytes=1, cost=len, keep_newest=True)
+    cache.put("a", "aa")
+    cache.put("b", "bb")
+    assert len(cache) == 1 and "b" in cache
+    assert cache.full()
+    stats = cache.stats()
+    assert (stats["evictions"], stats["entries"], stats["max_entries"]) == (1, 1, 4)
+
+
+def test_stats_and_touch():
+    cache = LRUCache(max_entries=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.touch("a") and not cache.touch("z")
+    cache.put("c", 3)
+    assert "b" not in cache
+    cache.get("a")
+    cache.get("b")
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["hit_rate"]) == (1, 1, 0.5)
+    assert "bytes" not in stats
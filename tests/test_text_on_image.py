@@ -0,0 +1,17 @@
+import pytest
+import torch
+
+from wcoh_executor import render_workers
+from wcoh_text_on_image import wcoh_text_on_image
+
+
+@pytest.mark.parametrize("backend", ["thread", "process"])
+def test_missing_font_falls_back_to_default(monkeypatch, backend):
+    # 폰트 파일을 열 수 없으면 load_default() 로 그리며, 경로 없는 폰트도 렌더링 워커 설정과 무관하게 그려져야 한다
+    monkeypatch.setattr(wcoh_text_on_image, "fonts", {"missing": "/nonexistent/font.ttf"})
+    image = torch.zeros(2, 200, 300, 3)
+    with render_workers(2, backend):
+        (output,) = wcoh_text_on_image().add_text_to_image(
+            image, "first\nsecond", "missing", 40, "white", "black", 1, 1, "CENTER", 50, split_lines=True)
+    assert output.shape == (2, 200, 300, 3)
+    assert output[0].max() > 0 and output[1].max() > 0
@@ -0,0 +1,161 @@
+import math
+import os
+from PIL import Image, ImageDraw
+
+try:
+    from .wcoh_executor import render_map
+    from .wcoh_font_cache import font_key, get_font
+    from .wcoh_lru import LRUCache
+    from .wcoh_profile import register_cache
+    from .wcoh_shaping import shape_text
+except ImportError:
+    from wcoh_executor import render_map
+    from wcoh_font_cache import font_key, get_font
+    from wcoh_lru import LRUCache
+    from wcoh_profile import register_cache
+    from wcoh_shaping import shape_text
+
+DEFAULT_SUPERSAMPLE = 4
+# 단일 BICUBIC affine 변환이 에일리어싱 없이 줄일 수 있는 최대 배율
+MAX_TRANSFORM_SCALE = 4
+ATLAS_MAX_BYTES = int(float(os.environ.get("WCOH_GLYPH_ATLAS_MB", "64")) * 1024 * 1024)
+
+
+def _rasterize_glyph(path, font_size: int, variation, char: str, stroke_width: int, supersample: int):
+    # 고배율 폰트로 그린 뒤 변환 가능한 배율(MAX_TRANSFORM_SCALE)까지만 BOX 로 줄여 저장
+    big_font = get_font(path, font_size * supersample, variation)
+    big_stroke = stroke_width * supersample
+    left, top, right, bottom = big_font.getbbox(char, stroke_width=big_stroke)
+    size = (max(right - left, 1), max(bottom - top, 1))
+    fill_mask = Image.new("L", size, 0)
+    ImageDraw.Draw(fill_mask).text((-left, -top), char, font=big_font, fill=255)
+    stroke_mask = None
+    if stroke_width > 0:
+        stroke_mask = Image.new("L", size, 0)
+        ImageDraw.Draw(stroke_mask).text((-left, -top), char, font=big_font, fill=255,
+                                         stroke_width=big_stroke, stroke_fill=255)
+    scale = supersample
+    if supersample > MAX_TRANSFORM_SCALE:
+        scale = MAX_TRANSFORM_SCALE
+        reduced = (max(round(size[0] * scale / supersample), 1), max(round(size[1] * scale / supersample), 1))
+        fill_mask = fill_mask.resize(reduced, Image.Resampling.BOX)
+        if stroke_mask is not None:
+            stroke_mask = stroke_mask.resize(reduced, Image.Resampling.BOX)
+    return fill_mask, stroke_mask, scale
+
+
+def _rasterize_task(args):
+    (path, font_size, variation), char, stroke_width, supersample = args
+    return _rasterize_glyph(path, font_size, variation, char, stroke_width, supersample)
+
+
+class GlyphAtlas:
+    """글자별 알파 마스크를 (font, size, stroke, supersample) 단위로 한 번만 래스터화해 보관한다."""
+
+    def __init__(self, max_bytes: int = ATLAS_MAX_BYTES):
+        self._glyphs = LRUCache(max_bytes=max_bytes, cost=self._cost, keep_newest=True)
+
+    @staticmethod
+    def _cost(entry) -> int:
+        fill_mask, stroke_mask, _ = entry
+        return fill_mask.width * fill_mask.height * (2 if stroke_mask is not None else 1)
+
+    def get(self, font, char: str, stroke_width: int, supersample: int):
+        key = (font_key(font), int(stroke_width), int(supersample), char)
+        entry = self._glyphs.get(key)
+        if entry is not None:
+            return entry
+        entry = _rasterize_glyph(font.path, font.size, getattr(font, "wcoh_variation", None), char, stroke_width, supersample)
+        self._glyphs.put(key, entry)
+        return entry
+
+    def warm(self, font, chars, stroke_width: int, supersample: int):
+        # 아틀라스에 없는 글자만 렌더링 워커에 나눠 미리 래스터화
+        spec = (font.path, font.size, getattr(font, "wcoh_variation", None))
+        missing = {}
+        for char in chars:
+            key = (font_key(font), int(stroke_width), int(supersample), char)
+            if key not in self._glyphs:
+                missing[key] = (spec, char, int(stroke_width), int(supersample))
+        if len(missing) > 1:
+            for key, entry in zip(missing, render_map(_rasterize_task, missing.values())):
+                self._glyphs.put(key, entry)
+
+    def clear(self):
+        self._glyphs.clear()
+
+    def stats(self) -> dict:
+        return self._glyphs.stats()
+
+
+glyph_atlas = GlyphAtlas()
+register_cache("glyph_atlas", glyph_atlas.stats)
+
+
+def _place_mask(mask: Image.Image, scale: int, rotate_angle: float, resample) -> Image.Image:
+    # 회전 + 1/scale 축소를 한 번의 affine 변환으로 처리 (Image.rotate 와 같은 방향)
+    theta = -math.radians(rotate_angle)
+    cos, sin = math.cos(theta), math.sin(theta)
+    w, h = mask.width / scale, mask.height / scale
+    out_w = max(int(math.ceil(abs(w * cos) + abs(h * sin))), 1)
+    out_h = max(int(math.ceil(abs(w * sin) + abs(h * cos))), 1)
+    a, b = scale * cos, scale * sin
+    d, e = -scale * sin, scale * cos
+    c = mask.width / 2 - a * out_w / 2 - b * out_h / 2
+    f = mask.height / 2 - d * out_w / 2 - e * out_h / 2
+    return mask.transform((out_w, out_h), Image.Transform.AFFINE, (a, b, c, d, e, f), resample=resample)
+
+
+def render_glyph(font, char: str, rotate_angle: float, fill, stroke_fill, stroke_width: int = 0,
+                 supersample: int = DEFAULT_SUPERSAMPLE, atlas: GlyphAtlas = glyph_atlas) -> Image.Image:
+    fill_mask, stroke_mask, scale = atlas.get(font, char, stroke_width, supersample)
+    resample = Image.Resampling.BICUBIC if scale > 1 else Image.Resampling.BILINEAR
+    fill_alpha = _place_mask(fill_mask, scale, rotate_angle, resample)
+    if stroke_mask is None:
+        glyph = Image.new("RGBA", fill_alpha.size, fill)
+        glyph.putalpha(fill_alpha)
+        return glyph
+    stroke_alpha = _place_mask(stroke_mask, scale, rotate_angle, resample)
+    glyph = Image.new("RGBA", stroke_alpha.size, stroke_fill)
+    glyph.putalpha(stroke_alpha)
+    glyph.paste(fill, (0, 0), fill_alpha)
+    return glyph
+
+
+def arc_angles(run, start_angle, end_angle) -> list[float]:
+    """클러스터별 중심 각도. 첫/마지막 클러스터는 start/end_angle 에 두고, 사이는 shaping 된 advance
+    (커닝 포함) 의 호 길이 비율로 나눈다. 폭이 모두 같으면 기존의 등간격 배치와 같다."""
+    centers = [x + advance / 2 for x, advance in zip(run.positions, run.advances)]
+    if len(centers) < 2 or centers[-1] == centers[0]:
+        return [start_angle] * len(centers)
+    scale = (end_angle - start_angle) / (centers[-1] - centers[0])
+    return [start_angle + (center - centers[0]) * scale for center in centers]
+
+
+def arc_glyphs(text: str, font, center, radius, start_angle, end_angle, fill='black', stroke_fill='blue',
+               stroke_width=0, supersample: int = DEFAULT_SUPERSAMPLE) -> list[tuple[Image.Image, int, int]]:
+    """원호를 따라 배치한 글자별 (RGBA 글리프, x, y). draw_text_in_arc 가 이 순서대로 붙여 넣는다."""
+    # 조합형 자모 등이 한 글자로 그려지도록 shaping 결과의 클러스터 단위로 배치
+    run = shape_text(text, font)
+    clusters = run.clusters
+    angles = arc_angles(run, start_angle, end_angle)
+
+    # 글자별 회전(affine transform/paste)은 Pillow 가 GIL 을 놓고 실행하므로 워커 스레드에 나누고,
+    # 붙여넣기는 원래 순서대로 직렬 처리
+    glyph_atlas.warm(font, clusters, stroke_width, supersample)
+    glyphs = render_map(lambda item: render_glyph(font, item[0], item[1] - 90, fill, stroke_fill, stroke_width, supersample),
+                        zip(clusters, angles), backend="thread")
+    placed = []
+    for glyph, current_angle in zip(glyphs, angles):
+        angle = math.radians(current_angle)
+        x = center[0] + radius * math.cos(angle) - glyph.size[0] / 2
+        y = center[1] + radius * math.sin(angle) - glyph.size[1] / 2
+        placed.append((glyph, int(x), int(y)))
+    return placed
+
+
+def draw_text_in_arc(image: Image.Image, text: str, font, center, radius, start_angle, end_angle,
+                     fill='black', stroke_fill='blue', stroke_width=0, supersample: int = DEFAULT_SUPERSAMPLE):
+    for glyph, x, y in arc_glyphs(text, font, center, radius, start_angle, end_angle, fill, stroke_fill,
+                                  stroke_width, supersample):
+        image.paste(glyph, (x, y), glyph)
@@ -0,0 +1,33 @@
+from typing import Any, Sequence
+
+
+def batch_size(*values: Any) -> int:
+    # 텐서/리스트 입력 중 가장 긴 배치 길이 (스칼라는 1)
+    size = 1
+    for value in values:
+        if isinstance(value, (list, tuple)) or hasattr(value, "shape"):
+            size = max(size, len(value))
+    return size
+
+
+def broadcast(value: Any, size: int) -> list:
+    # 길이 1 이거나 스칼라면 배치 크기만큼 반복, 길이가 같으면 그대로 사용.
+    # 노드에 INPUT_IS_LIST 가 없으므로 그래프에서 오는 리스트는 텐서 배치뿐이고, 그 외 리스트는 Python 호출용이다
+    if not (isinstance(value, (list, tuple)) or hasattr(value, "shape")):
+        return [value] * size
+    items: Sequence = value
+    if len(items) == 1:
+        return [items[0]] * size
+    check_size(len(items), size)
+    return list(items)
+
+
+def check_size(length: int, size: int):
+    if length not in (1, size):
+        raise ValueError(f"배치 크기가 맞지 않습니다: {length} != {size}")
+
+
+def expand_batch(tensor, size: int):
+    # [1,...] 또는 [size,...] 텐서를 size 배치로 복사 (다른 리스트 입력과 같은 오류로 알림)
+    check_size(tensor.shape[0], size)
+    return tensor.expand(size, *tensor.shape[1:]).clone()
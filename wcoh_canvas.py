@@ -0,0 +1,57 @@
+import os
+from typing import Callable, Sequence
+import torch
+from PIL import Image, ImageColor
+
+try:
+    from .wcoh_convert import pil2tensor
+    from .wcoh_profile import record_alloc
+except ImportError:
+    from wcoh_convert import pil2tensor
+    from wcoh_profile import record_alloc
+
+# 글자 영역을 나눠 그리는 행 수 (임시 PIL 버퍼 크기 상한)
+CANVAS_STRIP_ROWS = int(os.environ.get("WCOH_CANVAS_STRIP_ROWS", "256"))
+
+# (left, top, right, bottom) 캔버스 좌표 영역과, 원점이 origin 인 strip 이미지에 그리는 함수
+Region = tuple[tuple[int, int, int, int], Callable[[Image.Image, tuple[int, int]], None]]
+
+
+def fill_canvas(width: int, height: int, color, mode: str = "RGBA") -> torch.Tensor:
+    # Image.new(mode, size, color) 를 pil2tensor 한 것과 같은 값을 PIL 캔버스 없이 한 번에 채운다
+    value = ImageColor.getcolor(color, mode) if isinstance(color, str) else color
+    value = value if isinstance(value, tuple) else (value,)
+    pixel = torch.tensor(value, dtype=torch.float32) / 255.0
+    return pixel.expand(1, height, width, len(value)).clone()
+
+
+def paint_regions(output: torch.Tensor, color, regions: Sequence[Region], mode: str = "RGBA",
+                  strip_rows: int = CANVAS_STRIP_ROWS) -> torch.Tensor:
+    """fill_canvas 로 채운 output([1,H,W,C]) 에서 regions 가 닿는 영역만 행 단위 strip 으로 그려 넣는다.
+
+    각 strip 은 배경색 PIL 이미지에 겹치는 region 을 순서대로 그린 뒤 output 의 해당 위치로 변환하므로,
+    전체 캔버스에 그린 결과와 같고 임시 메모리는 글자 영역 폭 x strip_rows 를 넘지 않는다.
+    """
+    height, width = output.shape[1], output.shape[2]
+    boxes = [box for box, _ in regions]
+    if not boxes:
+        return output
+    left = max(min(box[0] for box in boxes), 0)
+    top = max(min(box[1] for box in boxes), 0)
+    right = min(max(box[2] for box in boxes), width)
+    bottom = min(max(box[3] for box in boxes), height)
+    if left >= right or top >= bottom:
+        return output
+    strip_rows = max(int(strip_rows), 1)
+    record_alloc("strip", (right - left) * min(strip_rows, bottom - top) * len(mode))
+    for strip_top in range(top, bottom, strip_rows):
+        strip_bottom = min(strip_top + strip_rows, bottom)
+        touching = [paint for (_, box_top, _, box_bottom), paint in regions
+                    if box_top < strip_bottom and box_bottom > strip_top]
+        if not touching:
+            continue  # 글자가 없는 줄 사이는 배경 그대로
+        strip = Image.new(mode, (right - left, strip_bottom - strip_top), color)
+        for paint in touching:
+            paint(strip, (left, strip_top))
+        pil2tensor(strip, out=output[:, strip_top:strip_bottom, left:right])
+    return output
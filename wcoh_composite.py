@@ -0,0 +1,60 @@
+from typing import Optional, Tuple
+import torch
+import torch.nn.functional as F
+
+
+def premultiply(image: torch.Tensor) -> torch.Tensor:
+    # [..., 3] 은 불투명 알파를 붙이고, [..., 4] 는 RGB 에 알파를 곱한 새 텐서를 반환
+    if image.shape[-1] == 3:
+        alpha = torch.ones_like(image[..., :1])
+        return torch.cat((image, alpha), dim=-1)
+    out = image.clone()
+    out[..., :3].mul_(out[..., 3:4])
+    return out
+
+
+def resize(image: torch.Tensor, size: Tuple[int, int], mode: str = "bicubic") -> torch.Tensor:
+    # IMAGE 레이아웃 [B,H,W,C] 그대로 (width, height) 로 antialias 리사이즈
+    width, height = size
+    batched = image.dim() == 4
+    nchw = (image if batched else image.unsqueeze(0)).permute(0, 3, 1, 2)
+    resized = F.interpolate(nchw, size=(height, width), mode=mode, antialias=True, align_corners=False)
+    resized = resized.clamp_(0.0, 1.0).permute(0, 2, 3, 1).contiguous()
+    return resized if batched else resized[0]
+
+
+def alpha_over(base: torch.Tensor, overlay: torch.Tensor, x: int, y: int,
+               premultiplied: bool = False, out: Optional[torch.Tensor] = None) -> torch.Tensor:
+    """overlay([h,w,C] 또는 [B,h,w,C])를 base([B,H,W,C]) 의 (x, y) 위치에 합성한다.
+
+    out 을 생략하면 base 를 제자리에서 수정한다. 음수 좌표나 화면 밖 영역은 잘라낸다.
+    """
+    target = base if out is None else out.copy_(base)
+    height, width = target.shape[-3], target.shape[-2]
+    ov_height, ov_width = overlay.shape[-3], overlay.shape[-2]
+    x0, y0 = max(x, 0), max(y, 0)
+    x1, y1 = min(x + ov_width, width), min(y + ov_height, height)
+    if x0 >= x1 or y0 >= y1:
+        return target
+
+    src = overlay[..., y0 - y:y1 - y, x0 - x:x1 - x, :].to(device=target.device, dtype=target.dtype)
+    dst = target[..., y0:y1, x0:x1, :]
+    channels = dst.shape[-1]
+    if src.shape[-1] == 3:
+        # 알파가 없는 오버레이는 불투명하게 덮어쓴다
+        dst[..., :3] = src
+        if channels == 4:
+            dst[..., 3] = 1.0
+        return target
+
+    # intra-op 스레드 수는 프로세스 전역 설정이라 노드 안에서 바꾸지 않는다 (OMP_NUM_THREADS 등으로 조정)
+    alpha = src[..., 3:4]
+    if premultiplied:
+        color = src if channels == 4 else src[..., :3]
+    else:
+        color = src[..., :channels].clone()
+        color[..., :3].mul_(alpha)
+        if channels == 4:
+            color[..., 3:4] = alpha
+    dst.mul_(1.0 - alpha).add_(color)
+    return target
@@ -0,0 +1,100 @@
+from typing import Optional, Union
+import numpy as np
+import torch
+from PIL import Image
+
+# tensor -> PIL 변환 시 한 번에 처리하는 행 수 (임시 버퍼 크기 제한)
+STRIP_ROWS = 256
+
+
+def normalize_mode(image: Image.Image) -> Image.Image:
+    # IMAGE 텐서는 [H,W,3] 또는 [H,W,4] 이므로 그 외 모드는 RGB/RGBA 로 맞춘다
+    mode = image.mode
+    if mode in ("RGB", "RGBA"):
+        return image
+    if mode in ("LA", "PA", "RGBa", "La") or (mode == "P" and "transparency" in image.info):
+        return image.convert("RGBA")
+    if mode == "1":
+        return image.convert("L")
+    if mode in ("L", "F") or mode.startswith("I"):
+        # 흑백은 numpy 단계에서 3채널로 브로드캐스트한다 (RGB 사본을 만들지 않음)
+        return image
+    return image.convert("RGB")
+
+
+def _array(image: Image.Image) -> tuple[np.ndarray, np.float32]:
+    array = np.asarray(image)
+    if image.mode == "F":
+        return array[..., None], np.float32(1.0)
+    if image.mode.startswith("I"):
+        return array[..., None], np.float32(65535.0)
+    if image.mode == "L":
+        return array[..., None], np.float32(255.0)
+    return array, np.float32(255.0)
+
+
+def _channels(image: Image.Image) -> int:
+    return 4 if image.mode == "RGBA" else 3
+
+
+def pil2tensor(image: Union[Image.Image, list[Image.Image]], out: Optional[torch.Tensor] = None) -> torch.Tensor:
+    """PIL 이미지(또는 리스트)를 [B,H,W,C] float32 텐서로 변환한다.
+
+    uint8 배열에서 미리 할당한 float32 버퍼로 바로 나누므로 중간 float 배열을 만들지 않는다.
+    """
+    images = image if isinstance(image, list) else [image]
+    first = normalize_mode(images[0])
+    if out is None:
+        out = torch.empty((len(images), first.height, first.width, _channels(first)), dtype=torch.float32)
+    for index, item in enumerate(images):
+        item = first if index == 0 else normalize_mode(item)
+        array, scale = _array(item)
+        target = out[index]
+        if tuple(target.shape[:2]) != array.shape[:2]:
+            raise ValueError(f"배치 안의 이미지 크기가 다릅니다: {item.size} != {(target.shape[1], target.shape[0])}")
+        if target.device.type == "cpu":
+            np.divide(array, scale, out=target.numpy())
+        else:
+            target.copy_(torch.from_numpy(np.array(array)).to(target.device)).div_(float(scale))
+    return out
+
+
+def uint8_to_tensor(array: np.ndarray, out: Optional[torch.Tensor] = None) -> torch.Tensor:
+    # [H,W,C] 또는 [B,H,W,C] uint8 배열 (memmap 포함) 을 float32 IMAGE 텐서로 변환
+    if array.ndim == 3:
+        array = array[None]
+    if out is None:
+        out = torch.empty(array.shape, dtype=torch.float32)
+    np.divide(array, np.float32(255.0), out=out.numpy())
+    return out
+
+
+def _strip_to_uint8(strip: torch.Tensor) -> np.ndarray:
+    values = strip.detach().to("cpu", torch.float32).numpy() * np.float32(255.0)
+    np.clip(values, 0.0, 255.0, out=values)
+    return values.astype(np.uint8)
+
+
+def tensor2pil(tensor: torch.Tensor) -> Image.Image:
+    """[H,W,C] 또는 [1,H,W,C] 텐서를 PIL 이미지로 변환한다 (장치 무관, 행 단위 스트립 변환)."""
+    if tensor.dim() == 4:
+        if tensor.shape[0] != 1:
+            raise ValueError(f"단일 이미지가 필요합니다 (batch={tensor.shape[0]}). tensor2pil_batch 를 사용하세요.")
+        tensor = tensor[0]
+    height, width = tensor.shape[0], tensor.shape[1]
+    channels = tensor.shape[2] if tensor.dim() == 3 else 1
+    if channels == 1 and tensor.dim() == 3:
+        tensor = tensor[..., 0]
+    mode = {1: "L", 3: "RGB", 4: "RGBA"}.get(channels)
+    if mode is None:
+        raise ValueError(f"지원하지 않는 채널 수입니다: {channels}")
+    image = Image.new(mode, (width, height))
+    for top in range(0, height, STRIP_ROWS):
+        image.paste(Image.fromarray(_strip_to_uint8(tensor[top:top + STRIP_ROWS])), (0, top))
+    return image
+
+
+def tensor2pil_batch(tensor: torch.Tensor) -> list[Image.Image]:
+    if tensor.dim() == 3:
+        return [tensor2pil(tensor)]
+    return [tensor2pil(item) for item in tensor]
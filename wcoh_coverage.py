@@ -0,0 +1,94 @@
+import os
+from typing import NamedTuple
+from PIL import Image, ImageColor, ImageDraw
+
+try:
+    from .wcoh_font_cache import font_key
+    from .wcoh_lru import LRUCache
+    from .wcoh_profile import register_cache
+    from .wcoh_shaping import shape_text
+except ImportError:
+    from wcoh_font_cache import font_key
+    from wcoh_lru import LRUCache
+    from wcoh_profile import register_cache
+    from wcoh_shaping import shape_text
+
+COVERAGE_CACHE_BYTES = int(float(os.environ.get("WCOH_COVERAGE_CACHE_MB", "128")) * 1024 * 1024)
+
+
+class Coverage(NamedTuple):
+    mask: Image.Image  # "L" 커버리지 마스크 (색/위치와 무관)
+    left: int          # draw.text 기준점에서 마스크 좌상단까지의 거리
+    top: int
+    width: int         # 글자 bbox 폭 (정렬 계산용)
+
+    @property
+    def nbytes(self) -> int:
+        return self.mask.width * self.mask.height
+
+
+def render_coverage(text: str, font, stroke_width: int = 0) -> Coverage:
+    # 외곽선이 없으면 shaping 결과의 bbox 를 그대로 쓴다
+    left, top, right, bottom = font.getbbox(text, stroke_width=stroke_width) if stroke_width else shape_text(text, font).bbox
+    mask = Image.new("L", (max(right - left, 1), max(bottom - top, 1)), 0)
+    # fill 과 stroke_fill 이 같으면 draw.text 는 외곽선만 그리므로 외곽선 커버리지 그대로가 된다
+    ImageDraw.Draw(mask).text((-left, -top), text, font=font, fill=255,
+                              stroke_width=stroke_width, stroke_fill=255 if stroke_width else None)
+    return Coverage(mask, left, top, right - left)
+
+
+class CoverageCache:
+    """(text, font, stroke) 단위로 글자 커버리지 마스크를 보관하는 바이트 상한 LRU.
+
+    위치/색/그림자 오프셋만 바뀐 재실행은 래스터화 없이 이 마스크로 다시 합성한다.
+    """
+
+    def __init__(self, max_bytes: int = COVERAGE_CACHE_BYTES):
+        self._masks = LRUCache(max_bytes=max_bytes, cost=lambda coverage: coverage.nbytes)
+
+    def get(self, text: str, font, stroke_width: int = 0) -> Coverage:
+        key = (text, font_key(font), int(stroke_width))
+        coverage = self._masks.get(key)
+        if coverage is None:
+            coverage = render_coverage(text, font, int(stroke_width))
+            self._masks.put(key, coverage)
+        return coverage
+
+    def clear(self):
+        self._masks.clear()
+
+    def stats(self) -> dict:
+        return self._masks.stats()
+
+
+coverage_cache = CoverageCache()
+register_cache("coverage", coverage_cache.stats)
+
+
+def coverage_mask(text: str, font, stroke_width: int = 0) -> Coverage:
+    return coverage_cache.get(text, font, stroke_width)
+
+
+def draw_coverage(image: Image.Image, xy, text: str, font, fill, stroke_fill=None, stroke_width: int = 0):
+    """ImageDraw.text(xy, text, fill, font, stroke_width, stroke_fill) 와 같은 결과를 캐시된 마스크로 칠한다."""
+    x, y = int(xy[0]), int(xy[1])
+    ink = ImageColor.getcolor(fill, image.mode) if isinstance(fill, str) else fill
+    if stroke_width:
+        stroke_ink = ink if stroke_fill is None else (
+            ImageColor.getcolor(stroke_fill, image.mode) if isinstance(stroke_fill, str) else stroke_fill)
+        stroke = coverage_mask(text, font, stroke_width)
+        image.paste(stroke_ink, (x + stroke.left, y + stroke.top), stroke.mask)
+        if ink == stroke_ink:
+            return
+    coverage = coverage_mask(text, font)
+    image.paste(ink, (x + coverage.left, y + coverage.top), coverage.mask)
+
+
+def coverage_bbox(xy, text: str, font, stroke_width: int = 0) -> tuple[int, int, int, int]:
+    # draw_coverage(image, xy, ...) 가 칠하는 영역 (left, top, right, bottom)
+    x, y = int(xy[0]), int(xy[1])
+    masks = [coverage_mask(text, font)]
+    if stroke_width:
+        masks.append(coverage_mask(text, font, stroke_width))
+    return (min(x + m.left for m in masks), min(y + m.top for m in masks),
+            max(x + m.left + m.mask.width for m in masks), max(y + m.top + m.mask.height for m in masks))
@@ -0,0 +1,74 @@
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Callable, Iterable, Optional
+
+# 1 이면 직렬 실행. 기본은 CPU 코어 수 (최대 32)
+RENDER_WORKERS = int(os.environ.get("WCOH_RENDER_WORKERS", str(min(32, os.cpu_count() or 1))))
+# FreeType 래스터화(draw.text/getmask2)는 GIL 을 잡은 채 실행되어 스레드로는 빨라지지 않으므로 글자 래스터화의
+# 기본은 "serial" (호출 스레드에서 직렬). "process" 는 프로세스 풀로 나눈다 (작업 함수/인자가 pickle 가능해야 함).
+# "thread" 는 GIL 을 놓는 resize/transform/paste 만 하는 작업에 호출 측에서 backend="thread" 로 지정해 쓴다
+RENDER_BACKEND = os.environ.get("WCOH_RENDER_BACKEND", "serial").lower()
+BACKENDS = ("serial", "thread", "process")
+
+_lock = threading.Lock()
+_pools: dict[tuple[str, int], object] = {}
+_local = threading.local()
+_settings = {"workers": RENDER_WORKERS, "backend": RENDER_BACKEND}
+
+
+def _pool(backend: str, workers: int):
+    key = (backend, workers)
+    with _lock:
+        pool = _pools.get(key)
+        if pool is None:
+            if backend == "process":
+                pool = ProcessPoolExecutor(max_workers=workers, initializer=_mark_worker)
+            else:
+                pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="wcoh_render",
+                                          initializer=_mark_worker)
+            _pools[key] = pool
+        return pool
+
+
+def _mark_worker():
+    _local.worker = True
+
+
+@contextmanager
+def render_workers(workers: Optional[int] = None, backend: Optional[str] = None):
+    """`with render_workers(8):` 블록 안에서만 워커 수/백엔드를 바꾼다 (벤치마크용)."""
+    if backend is not None and backend not in BACKENDS:
+        raise ValueError(f"지원하지 않는 렌더링 백엔드입니다: {backend}")
+    previous = dict(_settings)
+    if workers is not None:
+        _settings["workers"] = workers
+    if backend is not None:
+        _settings["backend"] = backend
+    try:
+        yield
+    finally:
+        _settings.update(previous)
+
+
+def render_map(fn: Callable, items: Iterable, workers: Optional[int] = None, backend: Optional[str] = None) -> list:
+    """fn 을 items 에 적용한 결과를 입력 순서대로 반환한다.
+
+    각 항목은 서로 독립이어야 하며, 결과는 직렬 실행과 동일하다. 워커 스레드 안에서 다시
+    호출되면 풀 고갈(교착)을 피하기 위해 직렬로 실행한다.
+    """
+    items = list(items)
+    workers = _settings["workers"] if workers is None else workers
+    backend = _settings["backend"] if backend is None else backend
+    if backend == "serial" or min(workers, len(items)) <= 1 or getattr(_local, "worker", False):
+        return [fn(item) for item in items]
+    return list(_pool(backend, workers).map(fn, items))
+
+
+def shutdown():
+    with _lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.shutdown(wait=True)
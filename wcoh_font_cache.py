@@ -0,0 +1,131 @@
+import os
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Optional, Union
+from PIL import ImageFont
+
+try:
+    from .wcoh_lru import LRUCache
+    from .wcoh_profile import register_cache
+except ImportError:
+    from wcoh_lru import LRUCache
+    from wcoh_profile import register_cache
+
+# 폰트 캐시 메모리 상한 (MB). 환경 변수로 조정 가능
+DEFAULT_MAX_BYTES = int(float(os.environ.get("WCOH_FONT_CACHE_MB", "256")) * 1024 * 1024)
+DEFAULT_MAX_ENTRIES = int(os.environ.get("WCOH_FONT_CACHE_ENTRIES", "64"))
+
+Variation = Union[None, str, tuple]
+
+
+def font_key(font) -> tuple:
+    # 레이아웃/캐시 키로 쓰는 폰트 식별자
+    return (getattr(font, "path", None), getattr(font, "size", None), getattr(font, "index", 0),
+            getattr(font, "wcoh_variation", None))
+
+
+class FontCache:
+    """(path, size, variation) 단위로 FreeTypeFont 를 공유하는 LRU 캐시.
+
+    같은 키를 여러 스레드가 동시에 요청하면 한 번만 로드하고 나머지는 그 결과를 기다린다 (warm-up 포함).
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES, max_entries: int = DEFAULT_MAX_ENTRIES):
+        # 상한보다 큰 폰트 하나도 보관한다 (쓰는 중인 폰트를 매번 다시 열지 않도록)
+        self._fonts = LRUCache(max_entries, max_bytes, keep_newest=True)
+        self._loading: dict[tuple, Future] = {}
+        self._lock = self._fonts.lock
+        self.waits = 0
+
+    @staticmethod
+    def _normalize_variation(variation: Variation) -> Variation:
+        if variation is None or isinstance(variation, str):
+            return variation
+        return tuple(variation)
+
+    @staticmethod
+    def _load(path: str, size: int, variation: Variation) -> ImageFont.FreeTypeFont:
+        font = ImageFont.truetype(path, size)
+        if isinstance(variation, str):
+            font.set_variation_by_name(variation)
+        elif variation is not None:
+            font.set_variation_by_axes(list(variation))
+        font.wcoh_variation = variation
+        return font
+
+    @staticmethod
+    def _estimate_bytes(path: str) -> int:
+        # FreeType 은 face 마다 파일 내용을 들고 있으므로 파일 크기를 비용으로 본다
+        try:
+            return os.path.getsize(path)
+        except OSError:
+            return 0
+
+    def get(self, path: Union[str, Path], size: int, variation: Variation = None) -> ImageFont.FreeTypeFont:
+        path = os.fspath(path)
+        variation = self._normalize_variation(variation)
+        key = (path, int(size), variation)
+        with self._lock:
+            # 로드 중인 키는 miss 대신 wait 로 센다
+            waiting = self._loading.get(key)
+            if waiting is None:
+                font = self._fonts.get(key)
+                if font is not None:
+                    return font
+                loading = self._loading[key] = Future()
+            else:
+                self.waits += 1
+        if waiting is not None:
+            # 다른 스레드가 로드 중이면 그 인스턴스를 기다려 공유
+            return waiting.result()
+        try:
+            font = self._load(path, int(size), variation)
+        except BaseException as e:
+            with self._lock:
+                self._loading.pop(key, None)
+            loading.set_exception(e)
+            raise
+        cost = self._estimate_bytes(path)
+        with self._lock:
+            self._loading.pop(key, None)
+            self._fonts.put(key, font, cost)
+        loading.set_result(font)
+        return font
+
+    def touch(self, path: Union[str, Path], size: int, variation: Variation = None) -> bool:
+        # 이미 열린 폰트를 가장 최근 사용으로 옮긴다 (hit/miss 통계나 로드 없이)
+        return self._fonts.touch((os.fspath(path), int(size), self._normalize_variation(variation)))
+
+    def full(self) -> bool:
+        # warm-up 이 사용 중인 폰트를 밀어내지 않도록 여유가 있을 때만 채운다
+        return self._fonts.full()
+
+    def resize(self, max_bytes: Optional[int] = None, max_entries: Optional[int] = None):
+        self._fonts.resize(max_entries, max_bytes)
+
+    def clear(self):
+        self._fonts.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {**self._fonts.stats(), "waits": self.waits}
+
+
+# 모든 wcoh 노드가 공유하는 프로세스 전역 캐시
+font_cache = FontCache()
+register_cache("font", font_cache.stats)
+
+
+def font_fingerprint(*paths) -> str:
+    # IS_CHANGED 용 값: 입력이 같아도 폰트 파일이 교체되면 달라진다
+    parts = []
+    for path in paths:
+        try:
+            parts.append(f"{path}:{os.stat(path).st_mtime_ns}")
+        except (OSError, TypeError, ValueError):
+            parts.append(f"{path}:-")
+    return "|".join(parts)
+
+
+def get_font(path: Union[str, Path], size: int, variation: Variation = None) -> ImageFont.FreeTypeFont:
+    return font_cache.get(path, size, variation)
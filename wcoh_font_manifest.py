@@ -0,0 +1,122 @@
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Iterable, Optional, Union
+
+here = Path(__file__).parent.absolute()
+comfy_dir = here.parent.parent
+
+FONT_EXTENSIONS = (".ttf", ".otf", ".woff", ".woff2", ".eot")
+MANIFEST_VERSION = 1
+MANIFEST_PATH = Path(os.environ.get("WCOH_FONT_MANIFEST", here / "font_manifest.json"))
+
+
+def default_font_dirs() -> list[Path]:
+    # 번들 폰트(이 폴더) + ComfyUI 폰트 폴더 + WCOH_FONT_DIRS (os.pathsep 구분)
+    dirs = [here, comfy_dir / "fonts", comfy_dir / "models" / "fonts"]
+    extra = os.environ.get("WCOH_FONT_DIRS", "")
+    dirs.extend(Path(d) for d in extra.split(os.pathsep) if d)
+    return dirs
+
+
+class FontManifest:
+    """설정된 폰트 폴더만 한 번에 훑고, 디렉터리 mtime 으로 증분 갱신하는 폰트 목록."""
+
+    def __init__(self, dirs: Optional[Iterable[Union[str, Path]]] = None, manifest_path: Optional[Path] = MANIFEST_PATH):
+        self.dirs = [Path(d) for d in (dirs if dirs is not None else default_font_dirs())]
+        self.manifest_path = manifest_path
+        # 디렉터리 경로 -> {"mtime": ns, "fonts": [파일 경로], "subdirs": [하위 디렉터리 경로]}
+        self._entries: dict[str, dict] = {}
+        self._fonts: Optional[dict[str, str]] = None
+        self._lock = threading.RLock()
+        self.scanned_dirs = 0
+        self._load()
+
+    def _load(self):
+        if self.manifest_path is None:
+            return
+        try:
+            with open(self.manifest_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get("version") == MANIFEST_VERSION:
+            self._entries = data.get("dirs", {})
+
+    def _write(self):
+        with open(self.manifest_path, "w", encoding="utf-8") as f:
+            json.dump({"version": MANIFEST_VERSION, "dirs": self._entries}, f, ensure_ascii=False)
+
+    def _save(self):
+        if self.manifest_path is None:
+            return
+        try:
+            created = not self.manifest_path.exists()
+            self._write()
+            parent = os.path.abspath(self.manifest_path.parent)
+            if created and parent in self._entries:
+                # manifest 파일 생성으로 바뀐 폴더 mtime 을 반영해 다음 실행에서 재스캔하지 않게 한다
+                self._entries[parent]["mtime"] = os.stat(parent).st_mtime_ns
+                self._write()
+        except OSError as e:
+            print(f"[wcoh] 폰트 manifest 저장 실패: {e}")
+
+    def _walk(self, root: str, entries: dict[str, dict]):
+        # 디렉터리 mtime 이 그대로면 목록을 다시 읽지 않고 하위 디렉터리만 stat 으로 확인
+        stack = [root]
+        while stack:
+            directory = stack.pop()
+            try:
+                mtime = os.stat(directory).st_mtime_ns
+            except OSError:
+                continue
+            entry = self._entries.get(directory)
+            if entry is None or entry["mtime"] != mtime:
+                fonts, subdirs = [], []
+                try:
+                    with os.scandir(directory) as it:
+                        for item in it:
+                            if item.name.startswith("."):
+                                continue
+                            if item.is_dir(follow_symlinks=False):
+                                subdirs.append(item.path)
+                            elif os.path.splitext(item.name)[1].lower() in FONT_EXTENSIONS:
+                                fonts.append(item.path)
+                except OSError:
+                    continue
+                entry = {"mtime": mtime, "fonts": sorted(fonts), "subdirs": sorted(subdirs)}
+                self.scanned_dirs += 1
+            entries[directory] = entry
+            stack.extend(reversed(entry["subdirs"]))
+
+    def refresh(self) -> dict[str, str]:
+        with self._lock:
+            entries: dict[str, dict] = {}
+            for root in self.dirs:
+                root = os.path.abspath(root)
+                if root not in entries and os.path.isdir(root):
+                    self._walk(root, entries)
+            changed = entries != self._entries
+            self._entries = entries
+            if changed:
+                self._save()
+            fonts: dict[str, str] = {}
+            for entry in entries.values():
+                for path in entry["fonts"]:
+                    fonts.setdefault(Path(path).stem, Path(path).as_posix())
+            self._fonts = fonts
+            return fonts
+
+    def fonts(self) -> dict[str, str]:
+        with self._lock:
+            if self._fonts is None:
+                return self.refresh()
+            return self._fonts
+
+    def get(self, name: str, default: Optional[str] = None) -> Optional[str]:
+        return self.fonts().get(name, default)
+
+
+# 모든 wcoh 노드가 공유하는 폰트 목록
+font_manifest = FontManifest()
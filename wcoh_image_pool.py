@@ -0,0 +1,396 @@
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Optional, Union
+import numpy as np
+import torch
+from PIL import Image
+
+try:
+    from .wcoh_convert import normalize_mode, pil2tensor, uint8_to_tensor
+    from .wcoh_lru import LRUCache
+    from .wcoh_profile import register_cache
+except ImportError:
+    from wcoh_convert import normalize_mode, pil2tensor, uint8_to_tensor
+    from wcoh_lru import LRUCache
+    from wcoh_profile import register_cache
+
+VALID_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp", ".gif")
+IMAGE_CACHE_BYTES = int(float(os.environ.get("WCOH_IMAGE_CACHE_MB", "1024")) * 1024 * 1024)
+PREFETCH_WORKERS = int(os.environ.get("WCOH_PREFETCH_WORKERS", "2"))
+DECODE_WORKERS = int(os.environ.get("WCOH_DECODE_WORKERS", str(min(8, os.cpu_count() or 1))))
+FIT_MODES = ["letterbox", "resize", "crop"]
+# 디코딩 결과를 uint8 .npy 로 보관할 폴더. 비어 있으면 디스크 캐시를 쓰지 않는다
+DECODED_STORE_DIR = os.environ.get("WCOH_DECODED_CACHE_DIR", "")
+STORE_VERSION = 2
+
+
+def decode_image(path: Union[str, Path]) -> torch.Tensor:
+    with Image.open(path) as image:
+        return pil2tensor(image)
+
+
+class FolderIndex:
+    """폴더별 이미지 목록을 디렉터리 mtime 이 바뀔 때만 다시 읽는다."""
+
+    def __init__(self, extensions=VALID_EXTENSIONS):
+        self.extensions = extensions
+        self._folders: dict[str, tuple[int, list[Path]]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def mtime(folder: Union[str, Path]) -> int:
+        return os.stat(folder).st_mtime_ns
+
+    def files(self, folder: Union[str, Path]) -> list[Path]:
+        key = os.fspath(folder)
+        mtime = self.mtime(key)
+        with self._lock:
+            entry = self._folders.get(key)
+            if entry is not None and entry[0] == mtime:
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+        # 정렬해 두어야 같은 seed 가 항상 같은 파일을 고른다
+        with os.scandir(key) as entries:
+            files = sorted(Path(e.path) for e in entries
+                           if e.is_file() and os.path.splitext(e.name)[1].lower() in self.extensions)
+        with self._lock:
+            self._folders[key] = (mtime, files)
+        return files
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "folders": len(self._folders),
+            }
+
+    def invalidate(self, folder: Optional[Union[str, Path]] = None):
+        with self._lock:
+            if folder is None:
+                self._folders.clear()
+            else:
+                self._folders.pop(os.fspath(folder), None)
+
+
+class DecodedImageStore:
+    """디코딩된 이미지를 원본 파일별 uint8 .npy 로 디스크에 보관하고 memmap 으로 읽는 저장소.
+
+    원본마다 작은 index 파일({해시}.json) 하나에 (npy 파일, mtime, shape) 를 기록하므로 여러 ComfyUI
+    프로세스가 같은 폴더를 채워도 서로의 항목을 덮어쓰지 않고, 한 번의 miss 는 자기 파일만 쓴다.
+    원본 mtime 이 바뀌면 다시 만들고, 어떤 index 도 가리키지 않는 .npy 는 지운다.
+    """
+
+    def __init__(self, root: Union[str, Path]):
+        self.root = Path(root)
+        # 원본 경로 -> (index 파일 mtime, {"source", "file", "mtime", "shape"})
+        self._entries: dict[str, tuple[int, dict]] = {}
+        self._pruned = False
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _digest(key: str) -> str:
+        return hashlib.blake2b(key.encode("utf-8"), digest_size=16).hexdigest()
+
+    def _replace(self, target: Path, write):
+        # 같은 폴더의 임시 파일에 쓴 뒤 교체해 다른 프로세스가 반쯤 쓴 파일을 보지 않게 한다
+        temp = target.with_name(f"{target.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            with open(temp, "wb") as f:
+                write(f)
+            os.replace(temp, target)
+        finally:
+            if temp.exists():
+                temp.unlink()
+
+    def _read_entry(self, key: str) -> Optional[dict]:
+        # 다른 프로세스가 index 파일을 갱신했으면 다시 읽는다
+        path = self.root / f"{self._digest(key)}.json"
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            return None
+        with self._lock:
+            cached = self._entries.get(key)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if data.get("version") != STORE_VERSION or data.get("source") != key:
+            return None
+        with self._lock:
+            self._entries[key] = (mtime, data)
+        return data
+
+    def entry(self, path: Union[str, Path]) -> Optional[dict]:
+        """원본 mtime 과 일치하는 index 항목. 없거나 원본이 바뀌었으면 None."""
+        key = os.path.abspath(path)
+        mtime = os.stat(key).st_mtime_ns
+        entry = self._read_entry(key)
+        if entry is None or entry["mtime"] != mtime or not (self.root / entry["file"]).exists():
+            return None
+        return entry
+
+    def array(self, path: Union[str, Path]) -> Optional[np.ndarray]:
+        """[H,W,C] uint8 memmap. 16비트/float 이미지처럼 uint8 로 담을 수 없으면 None."""
+        key = os.path.abspath(path)
+        entry = self.entry(key)
+        if entry is not None:
+            with self._lock:
+                self.hits += 1
+            return np.load(self.root / entry["file"], mmap_mode="r")
+        with self._lock:
+            self.misses += 1
+        return self._build(key)
+
+    def _build(self, key: str) -> Optional[np.ndarray]:
+        mtime = os.stat(key).st_mtime_ns
+        with Image.open(key) as image:
+            image = normalize_mode(image)
+            if image.mode == "L":
+                image = image.convert("RGB")
+            elif image.mode not in ("RGB", "RGBA"):
+                return None
+            array = np.asarray(image)
+        if not self._pruned:
+            self._pruned = True
+            self.prune()
+        digest = self._digest(key)
+        # 파일 이름에 mtime 을 넣어 다른 프로세스가 memmap 중인 이전 버전을 덮어쓰지 않는다
+        name = f"{digest}-{mtime}.npy"
+        entry = {"version": STORE_VERSION, "source": key, "file": name, "mtime": mtime, "shape": list(array.shape)}
+        # index 를 먼저 써야 다른 프로세스의 prune 이 막 쓴 .npy 를 고아로 보고 지우지 않는다
+        # (그 사이에 읽는 쪽은 .npy 가 아직 없으므로 직접 디코딩한다)
+        try:
+            self.root.mkdir(parents=True, exist_ok=True)
+            self._replace(self.root / f"{digest}.json",
+                          lambda f: f.write(json.dumps(entry, ensure_ascii=False).encode("utf-8")))
+            self._replace(self.root / name, lambda f: np.save(f, array))
+        except OSError as e:
+            print(f"[wcoh] 디코딩 캐시 저장 실패: {e}")
+            return array
+        # 같은 원본의 이전 버전은 더 이상 가리키는 index 가 없다
+        for old in self.root.glob(f"{digest}-*.npy"):
+            if old.name != name:
+                try:
+                    old.unlink()
+                except OSError:
+                    pass
+        return np.load(self.root / name, mmap_mode="r")
+
+    def prune(self) -> int:
+        """어떤 index 파일도 가리키지 않는 .npy (이전 버전, 중단된 쓰기의 잔여물) 를 지우고 지운 수를 반환."""
+        removed = 0
+        try:
+            names = os.listdir(self.root)
+        except OSError:
+            return 0
+        current = {}
+        for name in names:
+            if name.endswith(".tmp"):
+                # 중단된 쓰기의 임시 파일 (쓰는 중일 수 있으므로 한 시간 넘게 지난 것만)
+                try:
+                    if time.time() - os.stat(self.root / name).st_mtime > 3600:
+                        os.remove(self.root / name)
+                        removed += 1
+                except OSError:
+                    pass
+                continue
+            if not name.endswith(".npy"):
+                continue
+            digest = name.split("-", 1)[0]
+            if digest not in current:
+                try:
+                    with open(self.root / f"{digest}.json", "r", encoding="utf-8") as f:
+                        current[digest] = json.load(f).get("file")
+                except (OSError, ValueError):
+                    current[digest] = None
+            if current[digest] != name:
+                try:
+                    os.remove(self.root / name)
+                    removed += 1
+                except OSError:
+                    pass
+        return removed
+
+    def decode(self, path: Union[str, Path]) -> torch.Tensor:
+        # DecodedImageCache 의 decoder 로 쓴다. 디스크에 담을 수 없는 이미지는 PIL 디코딩
+        array = self.array(path)
+        if array is None:
+            return decode_image(path)
+        return uint8_to_tensor(array)
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "entries": len(self._entries),
+            }
+
+
+class DecodedImageCache:
+    """디코딩된 IMAGE 텐서를 (path, mtime) 단위로 보관하는 바이트 상한 LRU 캐시."""
+
+    def __init__(self, max_bytes: int = IMAGE_CACHE_BYTES, decoder=decode_image, prefetch_workers: int = PREFETCH_WORKERS):
+        self.decoder = decoder
+        self._images = LRUCache(max_bytes=max_bytes, cost=lambda tensor: tensor.element_size() * tensor.nelement())
+        self._pending: dict[tuple, Future] = {}
+        # 프리페치 대기 목록도 LRU 와 같은 잠금으로 보호한다
+        self._lock = self._images.lock
+        self._executor = ThreadPoolExecutor(max_workers=max(prefetch_workers, 1), thread_name_prefix="wcoh_prefetch")
+
+    @staticmethod
+    def _key(path: Path) -> tuple:
+        return (os.fspath(path), os.stat(path).st_mtime_ns)
+
+    def _store(self, key: tuple, tensor: torch.Tensor):
+        with self._lock:
+            self._pending.pop(key, None)
+            self._images.put(key, tensor)
+
+    def _decode(self, key: tuple) -> torch.Tensor:
+        try:
+            tensor = self.decoder(key[0])
+        except BaseException:
+            with self._lock:
+                self._pending.pop(key, None)
+            raise
+        self._store(key, tensor)
+        return tensor
+
+    def get(self, path: Path) -> torch.Tensor:
+        key = self._key(path)
+        with self._lock:
+            tensor = self._images.get(key)
+            if tensor is not None:
+                return tensor
+            future = self._pending.get(key)
+        if future is not None:
+            # 백그라운드에서 디코딩 중이면 그 결과를 기다린다
+            return future.result()
+        return self._decode(key)
+
+    def prefetch(self, paths):
+        for path in paths:
+            try:
+                key = self._key(path)
+            except OSError:
+                continue
+            with self._lock:
+                if key in self._images or key in self._pending:
+                    continue
+                self._pending[key] = self._executor.submit(self._decode, key)
+
+    def clear(self):
+        self._images.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {**self._images.stats(), "pending": len(self._pending)}
+
+
+def pick_index(count: int, seed: int) -> int:
+    return random.Random(seed).randrange(count)
+
+
+def sample_indices(count: int, samples: int, seed: int, replacement: bool = True) -> list[int]:
+    if samples == 1:
+        return [pick_index(count, seed)]
+    rng = random.Random(seed)
+    if replacement:
+        return [rng.randrange(count) for _ in range(samples)]
+    if samples > count:
+        raise ValueError(f"중복 없이 {samples}개를 뽑기에는 이미지가 {count}개뿐입니다.")
+    return rng.sample(range(count), samples)
+
+
+def fit_image(image: Image.Image, size: tuple[int, int], fit: str = "letterbox") -> Image.Image:
+    width, height = size
+    if image.size == size:
+        return image
+    if fit == "resize":
+        return image.resize(size, Image.Resampling.LANCZOS)
+    ratio = (max if fit == "crop" else min)(width / image.width, height / image.height)
+    scaled = (max(round(image.width * ratio), 1), max(round(image.height * ratio), 1))
+    resized = image.resize(scaled, Image.Resampling.LANCZOS)
+    if fit == "crop":
+        left, top = (scaled[0] - width) // 2, (scaled[1] - height) // 2
+        return resized.crop((left, top, left + width, top + height))
+    # letterbox: 비율 유지 후 남는 영역은 검정(투명)으로 채움
+    canvas = Image.new(image.mode, size)
+    canvas.paste(resized, ((width - scaled[0]) // 2, (height - scaled[1]) // 2))
+    return canvas
+
+
+def fit_tensor(image: torch.Tensor, size: tuple[int, int], fit: str = "letterbox") -> torch.Tensor:
+    # 디코딩 캐시의 [1,H,W,C] 텐서를 load_batch 와 같은 방식으로 맞춘 새 텐서 (k/255 값이라 uint8 로 정확히 되돌아감)
+    if (image.shape[2], image.shape[1]) == tuple(size):
+        return image.clone()
+    array = np.rint(image[0].numpy() * np.float32(255.0)).astype(np.uint8)
+    return pil2tensor(fit_image(Image.fromarray(array), size, fit))
+
+
+def _batch_mode(image: Image.Image) -> str:
+    return "RGBA" if image.mode in ("RGBA", "LA", "PA") or "transparency" in image.info else "RGB"
+
+
+def load_batch(paths: list[Path], size: Optional[tuple[int, int]] = None, fit: str = "letterbox",
+               workers: int = DECODE_WORKERS, store: Optional[DecodedImageStore] = None) -> torch.Tensor:
+    """여러 이미지를 병렬 디코딩해 미리 할당한 [N,H,W,C] 텐서에 바로 써 넣는다."""
+    with Image.open(paths[0]) as first:
+        mode = _batch_mode(first)
+        if size is None:
+            size = first.size
+    width, height = size
+    out = torch.empty((len(paths), height, width, len(mode)), dtype=torch.float32)
+
+    def load(index: int):
+        array = store.array(paths[index]) if store is not None else None
+        if array is not None:
+            if array.shape == (height, width, len(mode)):
+                # 크기/채널이 그대로 맞으면 memmap 에서 출력 버퍼로 바로 변환
+                uint8_to_tensor(array, out=out[index:index + 1])
+            else:
+                # PNG 를 다시 디코딩하지 않고 memmap 에서 맞춘다
+                image = fit_image(Image.fromarray(np.asarray(array)).convert(mode), size, fit)
+                pil2tensor(image, out=out[index:index + 1])
+            return
+        with Image.open(paths[index]) as image:
+            image = fit_image(image.convert(mode), size, fit)
+            pil2tensor(image, out=out[index:index + 1])
+
+    if workers > 1 and len(paths) > 1:
+        with ThreadPoolExecutor(max_workers=min(workers, len(paths)), thread_name_prefix="wcoh_decode") as executor:
+            list(executor.map(load, range(len(paths))))
+    else:
+        for index in range(len(paths)):
+            load(index)
+    return out
+
+
+folder_index = FolderIndex()
+decoded_store = DecodedImageStore(DECODED_STORE_DIR) if DECODED_STORE_DIR else None
+image_cache = DecodedImageCache(decoder=decoded_store.decode if decoded_store else decode_image)
+register_cache("folder_index", folder_index.stats)
+register_cache("decoded_image", image_cache.stats)
+if decoded_store is not None:
+    register_cache("decoded_store", decoded_store.stats)
@@ -0,0 +1,109 @@
+import threading
+from collections import OrderedDict
+from typing import Callable, Hashable, Optional
+
+
+class LRUCache:
+    """스레드 안전한 LRU. 항목 수(max_entries) 또는 cost 합(max_bytes) 상한을 넘으면 가장 오래된 항목부터 버린다.
+
+    값을 만드는 일(래스터화/디코딩 등)은 각 캐시가 잠금 밖에서 한 뒤 put 한다. 캐시별 부가 상태
+    (single-flight 대기, 프리페치 등)는 같은 `lock` 으로 보호할 수 있도록 재진입 가능한 잠금을 공개한다.
+    """
+
+    def __init__(self, max_entries: Optional[int] = None, max_bytes: Optional[int] = None,
+                 cost: Callable[[object], int] = lambda value: 0, keep_newest: bool = False):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.cost = cost
+        # True 면 상한보다 큰 항목도 버리지 않고, 비울 때도 가장 최근 항목 하나는 남긴다
+        self.keep_newest = keep_newest
+        self.lock = threading.RLock()
+        self._items: "OrderedDict[Hashable, tuple[object, int]]" = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable, default=None):
+        with self.lock:
+            entry = self._items.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            self._items.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: Hashable, value, cost: Optional[int] = None) -> bool:
+        # 이미 있는 키는 그대로 둔다 (동시에 만든 같은 값). 보관하지 않았으면 False
+        cost = self.cost(value) if cost is None else cost
+        with self.lock:
+            if key in self._items:
+                return False
+            if self.max_bytes is not None and cost > self.max_bytes and not self.keep_newest:
+                return False
+            self._items[key] = (value, cost)
+            self._bytes += cost
+            self._evict()
+            return key in self._items
+
+    def touch(self, key: Hashable) -> bool:
+        # hit/miss 통계 없이 가장 최근 사용으로 옮긴다
+        with self.lock:
+            if key not in self._items:
+                return False
+            self._items.move_to_end(key)
+            return True
+
+    def full(self) -> bool:
+        with self.lock:
+            return ((self.max_entries is not None and len(self._items) >= self.max_entries)
+                    or (self.max_bytes is not None and self._bytes >= self.max_bytes))
+
+    def _over(self) -> bool:
+        return ((self.max_entries is not None and len(self._items) > self.max_entries)
+                or (self.max_bytes is not None and self._bytes > self.max_bytes))
+
+    def _evict(self):
+        keep = 1 if self.keep_newest else 0
+        while len(self._items) > keep and self._over():
+            _, (_, cost) = self._items.popitem(last=False)
+            self._bytes -= cost
+            self.evictions += 1
+
+    def resize(self, max_entries: Optional[int] = None, max_bytes: Optional[int] = None):
+        with self.lock:
+            if max_entries is not None:
+                self.max_entries = max_entries
+            if max_bytes is not None:
+                self.max_bytes = max_bytes
+            self._evict()
+
+    def clear(self):
+        with self.lock:
+            self._items.clear()
+            self._bytes = 0
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self.lock:
+            return key in self._items
+
+    def __len__(self) -> int:
+        with self.lock:
+            return len(self._items)
+
+    def stats(self) -> dict:
+        with self.lock:
+            total = self.hits + self.misses
+            stats = {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / total if total else 0.0,
+                "entries": len(self._items),
+            }
+            if self.max_bytes is not None:
+                stats.update(bytes=self._bytes, max_bytes=self.max_bytes)
+            if self.max_entries is not None:
+                stats["max_entries"] = self.max_entries
+            return stats
@@ -1,15 +1,19 @@
 from pathlib import Path
-from typing import Union
-import numpy as np
+from typing import Optional
 import torch
-from PIL import Image
 
-def pil2tensor(image: Image.Image) -> torch.Tensor:
-    return torch.from_numpy(np.array(image).astype(np.float32) / 255.0).unsqueeze(0)
-
-def tensor2pil(tensor: torch.Tensor) -> Image.Image:
-    image = (tensor.squeeze(0).numpy() * 255.0).astype(np.uint8)
-    return Image.fromarray(image)
+try:
+    from .wcoh_batch import batch_size, broadcast, expand_batch
+    from .wcoh_composite import alpha_over
+    from .wcoh_convert import pil2tensor, tensor2pil
+    from .wcoh_overlay_cache import overlay_cache
+    from .wcoh_profile import instrument, record_alloc, stage
+except ImportError:
+    from wcoh_batch import batch_size, broadcast, expand_batch
+    from wcoh_composite import alpha_over
+    from wcoh_convert import pil2tensor, tensor2pil
+    from wcoh_overlay_cache import overlay_cache
+    from wcoh_profile import instrument, record_alloc, stage
 
 class wcoh_mask_overlay:
     def __init__(self):
@@ -20,10 +24,14 @@ class wcoh_mask_overlay:
         return {
             "required": {
                 "base_image": ("IMAGE", ),  # 기본 이미지
-                "mask_image": ("IMAGE", ),  # 오버레이할 마스크 이미지
                 "scale": ("FLOAT", {"default": 1.0, "min": 0.1, "max": 10.0, "step": 0.1}),  # 스케일 조정
                 "x_padding": ("INT", {"default": 0, "min": -5000, "max": 5000, "step": 1}),  # X축 패딩
                 "y_padding": ("INT", {"default": 0, "min": -5000, "max": 5000, "step": 1}),  # Y축 패딩
+            },
+            "optional": {
+                "mask_image": ("IMAGE", ),  # 오버레이할 마스크 이미지
+                "mask_path": ("STRING", {"default": ""}),  # mask_image 대신 디스크의 로고/마스크 파일을 바로 사용
+                "composite_mode": (["pil", "torch"], {"default": "pil"}),  # torch: PIL 변환 없이 텐서에서 합성
             }
         }
 
@@ -32,30 +40,82 @@ class wcoh_mask_overlay:
     FUNCTION = "apply_mask_overlay"
     CATEGORY = "wcoh_korean_func/mask_overlay"
 
-    def apply_mask_overlay(self, base_image: torch.Tensor, mask_image: torch.Tensor, scale: float, x_padding: int, y_padding: int):
-        # PyTorch Tensor를 PIL 이미지로 변환
-        base_pil = tensor2pil(base_image)
-        mask_pil = tensor2pil(mask_image).convert("RGBA")  # 투명도를 유지
+    @staticmethod
+    def mask_source(mask_image: Optional[torch.Tensor], mask_path: str):
+        # 마스크 텐서 또는 파일 경로와 마스크 장수
+        if mask_path:
+            if not Path(mask_path).is_file():
+                raise ValueError(f"마스크 파일을 찾을 수 없습니다: {mask_path}")
+            return mask_path, 1
+        if mask_image is None:
+            raise ValueError("mask_image 또는 mask_path 중 하나가 필요합니다")
+        return mask_image, len(mask_image)
+
+    @instrument("wcoh_mask_overlay.apply_mask_overlay")
+    def apply_mask_overlay(self, base_image: torch.Tensor, mask_image: Optional[torch.Tensor] = None, scale: float = 1.0,
+                           x_padding: int = 0, y_padding: int = 0, composite_mode: str = "pil", mask_path: str = ""):
+        if composite_mode == "torch":
+            return (self.apply_mask_overlay_torch(base_image, mask_image, scale, x_padding, y_padding, mask_path),)
+
+        # [B,H,W,C] 배치 처리: 길이 1 인 입력(마스크, 패딩)은 배치 전체에 브로드캐스트
+        # (패딩 리스트는 Python 에서 호출할 때만. 그래프에서는 마스크 IMAGE 배치로 항목별 마스크를 준다)
+        source, mask_count = self.mask_source(mask_image, mask_path)
+        batch = batch_size(base_image, list(range(mask_count)), x_padding, y_padding)
+        base_images = broadcast(base_image, batch)
+        mask_indices = broadcast(list(range(mask_count)), batch)
+        x_paddings = broadcast(x_padding, batch)
+        y_paddings = broadcast(y_padding, batch)
 
-        # 마스크 이미지를 기본 이미지의 너비에 맞게 비율 유지하여 리사이즈
-        base_width, base_height = base_pil.size
-        mask_width, mask_height = mask_pil.size
-        aspect_ratio = mask_height / mask_width
+        results = []
+        for base, mask_index, x_pad, y_pad in zip(base_images, mask_indices, x_paddings, y_paddings):
+            # PyTorch Tensor를 PIL 이미지로 변환
+            with stage("convert"):
+                base_pil = tensor2pil(base)
 
-        new_mask_width = int(base_width * scale)
-        new_mask_height = int(new_mask_width * aspect_ratio)
-        resized_mask = mask_pil.resize((new_mask_width, new_mask_height), Image.Resampling.LANCZOS)
+            # 마스크 이미지를 기본 이미지의 너비에 맞게 비율 유지하여 LANCZOS 리사이즈 (크기별로 캐시)
+            with stage("resize"):
+                resized_mask = overlay_cache.get(source, base_pil.width, scale, "pil", mask_index)
 
-        # 기본 이미지에 마스크 이미지 오버레이 (좌상단 기준)
-        overlay_image = base_pil.copy()
-        overlay_position = (
-            x_padding,  # 좌상단 X축 패딩 적용
-            y_padding   # 좌상단 Y축 패딩 적용
-        )
-        overlay_image.paste(resized_mask, overlay_position, resized_mask)
+            # 기본 이미지에 마스크 이미지 오버레이 (좌상단 기준, 패딩 적용)
+            with stage("paste"):
+                base_pil.paste(resized_mask, (x_pad, y_pad), resized_mask)
+            results.append(base_pil)
 
         # 결과 이미지를 PyTorch Tensor로 변환
-        return (pil2tensor(overlay_image),)
+        with stage("convert"):
+            output = pil2tensor(results)
+        record_alloc("output", output)
+        return (output,)
+
+    def apply_mask_overlay_torch(self, base_image: torch.Tensor, mask_image: Optional[torch.Tensor], scale: float,
+                                 x_padding: int, y_padding: int, mask_path: str = ""):
+        # float32 텐서 상태 그대로 리사이즈 + 알파 합성 (출력 배치 한 번만 복사)
+        source, mask_count = self.mask_source(mask_image, mask_path)
+        batch = batch_size(base_image, list(range(mask_count)), x_padding, y_padding)
+        x_paddings = broadcast(x_padding, batch)
+        y_paddings = broadcast(y_padding, batch)
+        with stage("convert"):
+            output = expand_batch(base_image, batch)
+        record_alloc("output", output)
+
+        # 마스크 이미지를 기본 이미지의 너비에 맞게 비율 유지하여 리사이즈 (premultiplied alpha, 크기별로 캐시)
+        base_width = output.shape[2]
+        with stage("resize"):
+            masks = [overlay_cache.get(source, base_width, scale, "torch", index, output.device) for index in range(mask_count)]
+
+        same_offsets = len(set(zip(x_paddings, y_paddings))) == 1
+        if same_offsets and mask_count in (1, batch):
+            # 모든 항목의 위치가 같으면 배치 전체를 한 번에 합성
+            with stage("paste"):
+                alpha_over(output, masks[0][0] if mask_count == 1 else torch.cat(masks), x_paddings[0], y_paddings[0],
+                           premultiplied=True)
+            return output
+
+        mask_indices = broadcast(list(range(mask_count)), batch)
+        for index, (mask_index, x_pad, y_pad) in enumerate(zip(mask_indices, x_paddings, y_paddings)):
+            with stage("paste"):
+                alpha_over(output[index:index + 1], masks[mask_index][0], x_pad, y_pad, premultiplied=True)
+        return output
 
 NODE_CLASS_MAPPINGS = {
     "wcoh_mask_overlay": wcoh_mask_overlay,
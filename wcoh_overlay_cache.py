@@ -0,0 +1,115 @@
+import hashlib
+import os
+import threading
+import weakref
+from pathlib import Path
+from typing import Union
+import torch
+from PIL import Image
+
+try:
+    from .wcoh_composite import premultiply, resize
+    from .wcoh_convert import pil2tensor, tensor2pil
+    from .wcoh_lru import LRUCache
+    from .wcoh_profile import register_cache
+except ImportError:
+    from wcoh_composite import premultiply, resize
+    from wcoh_convert import pil2tensor, tensor2pil
+    from wcoh_lru import LRUCache
+    from wcoh_profile import register_cache
+
+OVERLAY_CACHE_BYTES = int(float(os.environ.get("WCOH_OVERLAY_CACHE_MB", "128")) * 1024 * 1024)
+# 합성 방식별 리사이즈 필터 (PIL 경로는 기존과 같은 LANCZOS)
+FILTERS = {"pil": "lanczos", "torch": "bicubic"}
+
+Source = Union[torch.Tensor, str, Path]
+
+
+def _nbytes(overlay) -> int:
+    if isinstance(overlay, torch.Tensor):
+        return overlay.element_size() * overlay.nelement()
+    return overlay.width * overlay.height * len(overlay.getbands())
+
+
+class OverlayCache:
+    """(마스크 내용 해시, 목표 크기, 필터) 단위로 리사이즈된 오버레이를 보관하는 바이트 상한 LRU.
+
+    PIL 경로는 RGBA 이미지를, torch 경로는 합성에 바로 쓰는 premultiplied [1,h,w,4] 텐서를 보관한다.
+    """
+
+    def __init__(self, max_bytes: int = OVERLAY_CACHE_BYTES):
+        self._overlays = LRUCache(max_bytes=max_bytes, cost=_nbytes)
+        self._lock = threading.Lock()
+        # 같은 텐서/파일을 매번 해시하지 않도록 id(텐서) 와 (경로, mtime, 크기) 별 해시를 기억
+        self._tensor_digests: dict[int, tuple] = {}
+        self._file_digests: dict[str, tuple] = {}
+
+    def _tensor_digest(self, tensor: torch.Tensor) -> str:
+        entry = self._tensor_digests.get(id(tensor))
+        if entry is not None and entry[0]() is tensor and entry[1] == tensor._version:
+            return entry[2]
+        digest = hashlib.blake2b(tensor.detach().cpu().contiguous().numpy().tobytes(), digest_size=16).hexdigest()
+        key = id(tensor)
+        self._tensor_digests[key] = (weakref.ref(tensor, lambda _, key=key: self._tensor_digests.pop(key, None)),
+                                     tensor._version, digest)
+        return digest
+
+    def _file_entry(self, path: str) -> tuple:
+        # (digest, (width, height)). 파일이 바뀌면 (mtime, 크기) 가 달라져 다시 읽는다
+        stat = os.stat(path)
+        entry = self._file_digests.get(path)
+        if entry is not None and entry[0] == (stat.st_mtime_ns, stat.st_size):
+            return entry[1], entry[2]
+        with open(path, "rb") as f:
+            digest = hashlib.blake2b(f.read(), digest_size=16).hexdigest()
+        with Image.open(path) as image:
+            size = image.size
+        self._file_digests[path] = ((stat.st_mtime_ns, stat.st_size), digest, size)
+        return digest, size
+
+    def _source(self, source: Source, index: int) -> tuple:
+        if isinstance(source, torch.Tensor):
+            height, width = source.shape[-3], source.shape[-2]
+            return ("tensor", self._tensor_digest(source), index), (width, height)
+        path = os.path.abspath(os.fspath(source))
+        digest, size = self._file_entry(path)
+        return ("file", digest), size
+
+    @staticmethod
+    def _load(source: Source, index: int, size: tuple, mode: str, device):
+        if isinstance(source, torch.Tensor):
+            mask = source[index] if source.dim() == 4 else source
+            if mode == "torch":
+                return resize(premultiply(mask[None].to(device)), size)
+            return tensor2pil(mask).convert("RGBA").resize(size, Image.Resampling.LANCZOS)
+        # 디스크 에셋은 float32 IMAGE 텐서를 거치지 않고 PIL 에서 바로 리사이즈하거나 한 번만 변환
+        with Image.open(source) as image:
+            image = image.convert("RGBA")
+        if mode == "torch":
+            return resize(premultiply(pil2tensor(image).to(device)), size)
+        return image.resize(size, Image.Resampling.LANCZOS)
+
+    def get(self, source: Source, base_width: int, scale: float, mode: str = "pil", index: int = 0, device="cpu"):
+        """source(마스크 텐서 또는 이미지 경로)를 base_width * scale 너비로 비율 유지 리사이즈한 오버레이."""
+        with self._lock:
+            content, (width, height) = self._source(source, index)
+        new_width = int(base_width * scale)
+        new_height = int(new_width * (height / width))
+        key = (content, (new_width, new_height), FILTERS[mode], str(device) if mode == "torch" else None)
+        overlay = self._overlays.get(key)
+        if overlay is None:
+            overlay = self._load(source, index, (new_width, new_height), mode, device)
+            self._overlays.put(key, overlay)
+        return overlay
+
+    def clear(self):
+        self._overlays.clear()
+        with self._lock:
+            self._file_digests.clear()
+
+    def stats(self) -> dict:
+        return self._overlays.stats()
+
+
+overlay_cache = OverlayCache()
+register_cache("overlay", overlay_cache.stats)
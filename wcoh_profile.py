@@ -0,0 +1,177 @@
+import cProfile
+import functools
+import itertools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+from typing import Callable, Optional
+
+# WCOH_PROFILE=1 일 때만 계측. 꺼져 있으면 데코레이터/stage 는 아무 일도 하지 않는다
+ENABLED = os.environ.get("WCOH_PROFILE", "").lower() not in ("", "0", "false", "no")
+# 호출마다 덤프할 파일 종류: "cprofile", "trace" (쉼표 구분)
+DUMP_MODES = {mode.strip() for mode in os.environ.get("WCOH_PROFILE_DUMP", "").split(",") if mode.strip()}
+DUMP_DIR = Path(os.environ.get("WCOH_PROFILE_DIR", "wcoh_profile"))
+
+_NULL = nullcontext()
+_local = threading.local()
+_call_ids = itertools.count(1)
+
+
+class _Timing:
+    __slots__ = ("count", "total", "max")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, seconds: float):
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def as_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "total_ms": self.total * 1000.0,
+            "mean_ms": self.total / self.count * 1000.0 if self.count else 0.0,
+            "max_ms": self.max * 1000.0,
+        }
+
+
+class MetricsRegistry:
+    """노드/단계별 시간, 할당 크기, 캐시 적중률을 모으는 프로세스 내 레지스트리."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: dict[str, _Timing] = {}
+        self._stages: dict[tuple[str, str], _Timing] = {}
+        self._allocations: dict[tuple[str, str], list[int]] = {}
+        self._caches: dict[str, Callable[[], dict]] = {}
+
+    def record_call(self, node: str, seconds: float):
+        with self._lock:
+            self._calls.setdefault(node, _Timing()).add(seconds)
+
+    def record_stage(self, node: str, stage: str, seconds: float):
+        with self._lock:
+            self._stages.setdefault((node, stage), _Timing()).add(seconds)
+
+    def record_allocation(self, node: str, name: str, nbytes: int):
+        with self._lock:
+            entry = self._allocations.setdefault((node, name), [0, 0, 0])
+            entry[0] += 1
+            entry[1] += nbytes
+            entry[2] = max(entry[2], nbytes)
+
+    def register_cache(self, name: str, stats: Callable[[], dict]):
+        with self._lock:
+            self._caches[name] = stats
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            nodes: dict[str, dict] = {}
+            for node, timing in self._calls.items():
+                nodes.setdefault(node, {"stages": {}, "allocations": {}})["calls"] = timing.as_dict()
+            for (node, stage), timing in self._stages.items():
+                nodes.setdefault(node, {"stages": {}, "allocations": {}})["stages"][stage] = timing.as_dict()
+            for (node, name), (count, total, largest) in self._allocations.items():
+                nodes.setdefault(node, {"stages": {}, "allocations": {}})["allocations"][name] = {
+                    "count": count, "total_bytes": total, "max_bytes": largest,
+                }
+            caches = dict(self._caches)
+        return {"nodes": nodes, "caches": {name: stats() for name, stats in caches.items()}}
+
+    def reset(self):
+        with self._lock:
+            self._calls.clear()
+            self._stages.clear()
+            self._allocations.clear()
+
+
+metrics = MetricsRegistry()
+
+
+def register_cache(name: str, stats: Callable[[], dict]):
+    # 캐시 적중률은 꺼져 있어도 등록만 해 둔다 (snapshot 시점에만 호출)
+    metrics.register_cache(name, stats)
+
+
+def _current() -> Optional[dict]:
+    return getattr(_local, "call", None)
+
+
+@contextmanager
+def _stage(name: str):
+    call = _current()
+    node = call["node"] if call else "<none>"
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        end = time.perf_counter()
+        metrics.record_stage(node, name, end - start)
+        if call is not None:
+            call["events"].append((name, start, end))
+
+
+def stage(name: str):
+    """`with stage("font_load"):` 형태로 단계 시간을 기록한다."""
+    if not ENABLED:
+        return _NULL
+    return _stage(name)
+
+
+def record_alloc(name: str, value):
+    if not ENABLED:
+        return
+    nbytes = value if isinstance(value, int) else value.element_size() * value.nelement()
+    call = _current()
+    metrics.record_allocation(call["node"] if call else "<none>", name, nbytes)
+
+
+def _dump(node: str, call_id: int, start: float, end: float, events, profiler: Optional[cProfile.Profile]):
+    DUMP_DIR.mkdir(parents=True, exist_ok=True)
+    stem = DUMP_DIR / f"{time.strftime('%Y%m%d-%H%M%S')}_{call_id:06d}_{node}"
+    if profiler is not None:
+        profiler.dump_stats(f"{stem}.prof")
+    if "trace" in DUMP_MODES:
+        tid = threading.get_ident()
+        trace = [{"name": node, "ph": "X", "pid": os.getpid(), "tid": tid,
+                  "ts": start * 1e6, "dur": (end - start) * 1e6}]
+        trace.extend({"name": name, "ph": "X", "pid": os.getpid(), "tid": tid,
+                      "ts": s * 1e6, "dur": (e - s) * 1e6, "args": {"node": node}} for name, s, e in events)
+        with open(f"{stem}.trace.json", "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": trace, "displayTimeUnit": "ms"}, f)
+
+
+def instrument(node: str):
+    """노드 FUNCTION 진입점을 감싸 전체/단계별 시간과 선택적 cProfile·Chrome trace 를 남긴다."""
+
+    def decorator(fn):
+        if not ENABLED:
+            return fn
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            parent = _current()
+            call = _local.call = {"node": node, "events": []}
+            profiler = cProfile.Profile() if "cprofile" in DUMP_MODES else None
+            start = time.perf_counter()
+            try:
+                if profiler is not None:
+                    return profiler.runcall(fn, *args, **kwargs)
+                return fn(*args, **kwargs)
+            finally:
+                end = time.perf_counter()
+                _local.call = parent
+                metrics.record_call(node, end - start)
+                if DUMP_MODES:
+                    _dump(node, next(_call_ids), start, end, call["events"], profiler)
+
+        return wrapper
+
+    return decorator
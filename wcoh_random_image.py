@@ -1,13 +1,18 @@
 from pathlib import Path
-from typing import Union
-import random
-import numpy as np
-import torch
-from PIL import Image
 
+try:
+    from .wcoh_image_pool import FIT_MODES, decoded_store, fit_tensor, folder_index, image_cache, load_batch, pick_index, sample_indices
+    from .wcoh_profile import instrument, stage
+    from .wcoh_warmup import warmup
+except ImportError:
+    from wcoh_image_pool import FIT_MODES, decoded_store, fit_tensor, folder_index, image_cache, load_batch, pick_index, sample_indices
+    from wcoh_profile import instrument, stage
+    from wcoh_warmup import warmup
 
-def pil2tensor(image: Image.Image) -> torch.Tensor:
-    return torch.from_numpy(np.array(image).astype(np.float32) / 255.0).unsqueeze(0)
+
+DEFAULT_FOLDER = "/root/app/custom_nodes/wcoh/winter"
+# 기본 폴더(와 WCOH_WARMUP_FOLDERS) 목록을 미리 읽어 둔다
+warmup.folders([DEFAULT_FOLDER])
 
 
 class wcoh_random_image:
@@ -18,7 +23,16 @@ class wcoh_random_image:
     def INPUT_TYPES(cls):
         return {
             "required": {
-                "folder_path": ("STRING", {"default": "/root/app/custom_nodes/wcoh/winter"}),  # 폴더 경로 입력
+                "folder_path": ("STRING", {"default": DEFAULT_FOLDER}),  # 폴더 경로 입력
+                "seed": ("INT", {"default": 0, "min": 0, "max": 0xffffffffffffffff}),  # 선택 재현용 시드
+            },
+            "optional": {
+                "prefetch": ("INT", {"default": 0, "min": 0, "max": 64, "step": 1}),  # 다음 N 개 시드의 이미지를 미리 디코딩
+                "count": ("INT", {"default": 1, "min": 1, "max": 4096, "step": 1}),  # 한 번에 뽑을 이미지 수
+                "replacement": ("BOOLEAN", {"default": True}),  # 중복 허용 여부
+                "fit": (FIT_MODES, {"default": "letterbox"}),  # 크기가 다른 이미지를 맞추는 방식
+                "width": ("INT", {"default": 0, "min": 0, "max": 8192, "step": 1}),  # 0 이면 첫 이미지 크기
+                "height": ("INT", {"default": 0, "min": 0, "max": 8192, "step": 1}),
             }
         }
 
@@ -27,26 +41,52 @@ class wcoh_random_image:
     FUNCTION = "select_random_image"
     CATEGORY = "wcoh_korean_func/random_image"
 
-    def select_random_image(self, folder_path: str):
-        # 이미지 파일 확장자 필터링
-        valid_extensions = (".png", ".jpg", ".jpeg", ".bmp", ".gif")
+    @classmethod
+    def IS_CHANGED(cls, folder_path: str, seed: int = 0, **kwargs):
+        # 같은 seed 라도 폴더 내용이 바뀌면 다시 실행
+        try:
+            return f"{seed}:{folder_index.mtime(folder_path)}"
+        except OSError:
+            return float("nan")
+
+    @instrument("wcoh_random_image.select_random_image")
+    def select_random_image(self, folder_path: str, seed: int = 0, prefetch: int = 0, count: int = 1,
+                            replacement: bool = True, fit: str = "letterbox", width: int = 0, height: int = 0):
         folder = Path(folder_path)
 
         if not folder.is_dir():
             raise ValueError(f"'{folder_path}'는 유효한 폴더 경로가 아닙니다.")
 
-        # 폴더 내 이미지 파일 리스트 가져오기
-        image_files = [f for f in folder.iterdir() if f.suffix.lower() in valid_extensions]
+        # 폴더 내 이미지 파일 리스트 가져오기 (디렉터리 mtime 이 바뀔 때만 다시 읽음)
+        with stage("index"):
+            image_files = folder_index.files(folder)
 
         if not image_files:
             raise ValueError(f"'{folder_path}' 폴더에 이미지 파일이 없습니다.")
 
-        # 랜덤 이미지 선택
-        selected_image_path = random.choice(image_files)
-        selected_image = Image.open(selected_image_path)
+        if bool(width) != bool(height):
+            raise ValueError("width 와 height 는 둘 다 지정하거나 둘 다 0 이어야 합니다.")
+        size = (width, height) if width and height else None
+
+        if count > 1:
+            # N 장을 뽑아 병렬 디코딩 후 하나의 [N,H,W,C] 텐서로 반환
+            indices = sample_indices(len(image_files), count, seed, replacement)
+            with stage("decode"):
+                return (load_batch([image_files[i] for i in indices], size, fit, store=decoded_store),)
 
-        return (pil2tensor(selected_image),)
+        # 시드 기반 랜덤 이미지 선택
+        selected_image_path = image_files[pick_index(len(image_files), seed)]
+        if prefetch:
+            image_cache.prefetch(image_files[pick_index(len(image_files), seed + step)] for step in range(1, prefetch + 1))
 
+        with stage("decode"):
+            image = image_cache.get(selected_image_path)
+        if size is not None:
+            # 한 장을 뽑을 때도 width/height/fit 을 적용 (결과는 count > 1 경로와 같음)
+            with stage("resize"):
+                return (fit_tensor(image, size, fit),)
+        # 캐시 텐서를 그대로 내보내면 뒤 노드의 제자리 수정이 캐시까지 바꾸므로 사본을 반환
+        return (image.clone(),)
 
 NODE_CLASS_MAPPINGS = {
     "wcoh_random_image": wcoh_random_image,
@@ -0,0 +1,93 @@
+import os
+import unicodedata
+from typing import NamedTuple
+from PIL import ImageFont, features
+
+try:
+    from .wcoh_font_cache import font_key
+    from .wcoh_lru import LRUCache
+    from .wcoh_profile import register_cache
+except ImportError:
+    from wcoh_font_cache import font_key
+    from wcoh_lru import LRUCache
+    from wcoh_profile import register_cache
+
+# ImageFont.truetype 은 raqm 이 있으면 raqm, 없으면 basic 레이아웃으로 폰트를 연다
+RAQM_AVAILABLE = features.check("raqm")
+SHAPE_CACHE_SIZE = int(os.environ.get("WCOH_SHAPE_CACHE_SIZE", "4096"))
+
+
+class ShapedRun(NamedTuple):
+    clusters: tuple   # 글자 클러스터 (조합형 자모/결합 문자는 앞 글자와 하나)
+    advances: tuple   # 클러스터별 advance (다음 클러스터와의 커닝 포함)
+    positions: tuple  # 클러스터 시작 x (0 부터)
+    width: float      # font.getlength(text)
+    bbox: tuple       # font.getbbox(text) (left, top, right, bottom)
+
+
+def _joins_previous(char: str) -> bool:
+    code = ord(char)
+    # 조합형 한글 중성/종성, 결합 문자, 이음 문자/이체 선택자는 앞 글자와 한 클러스터로 그린다
+    return (0x1160 <= code <= 0x11FF or 0xD7B0 <= code <= 0xD7FF or unicodedata.combining(char) != 0
+            or code == 0x200D or 0xFE00 <= code <= 0xFE0F)
+
+
+def split_clusters(text: str) -> tuple:
+    clusters: list[str] = []
+    for char in text:
+        if clusters and _joins_previous(char):
+            clusters[-1] += char
+        else:
+            clusters.append(char)
+    return tuple(clusters)
+
+
+def layout_engine(font) -> str:
+    return "raqm" if getattr(font, "layout_engine", None) == ImageFont.Layout.RAQM else "basic"
+
+
+def shape_run(text: str, font) -> ShapedRun:
+    clusters = split_clusters(text)
+    singles = [font.getlength(cluster) for cluster in clusters]
+    # 두 클러스터를 함께 잰 길이에서 뒤 클러스터 길이를 빼면 앞 클러스터 advance + 커닝이 된다
+    advances = [font.getlength(clusters[i] + clusters[i + 1]) - singles[i + 1] for i in range(len(clusters) - 1)]
+    advances.extend(singles[-1:])
+    positions, x = [], 0.0
+    for advance in advances:
+        positions.append(x)
+        x += advance
+    return ShapedRun(clusters, tuple(advances), tuple(positions), font.getlength(text), tuple(font.getbbox(text)))
+
+
+class ShapeCache:
+    """(text, font, 레이아웃 엔진) 단위로 shaping 결과를 보관하는 LRU.
+
+    측정에만 쓴다: 줄바꿈 폭, 줄 박스, 커버리지 마스크 크기, 원호 글자 분할과 간격이 같은 결과를 공유한다.
+    래스터화(draw.text)는 Pillow 안에서 다시 shaping 하므로, 그 비용은 커버리지/스프라이트/글리프 캐시가
+    그린 결과를 재사용해서 줄인다.
+    """
+
+    def __init__(self, max_entries: int = SHAPE_CACHE_SIZE):
+        self._runs = LRUCache(max_entries)
+
+    def get(self, text: str, font) -> ShapedRun:
+        key = (text, font_key(font), layout_engine(font))
+        run = self._runs.get(key)
+        if run is None:
+            run = shape_run(text, font)
+            self._runs.put(key, run)
+        return run
+
+    def clear(self):
+        self._runs.clear()
+
+    def stats(self) -> dict:
+        return {**self._runs.stats(), "raqm": RAQM_AVAILABLE}
+
+
+shape_cache = ShapeCache()
+register_cache("shape", shape_cache.stats)
+
+
+def shape_text(text: str, font) -> ShapedRun:
+    return shape_cache.get(text, font)
@@ -0,0 +1,241 @@
+import argparse
+import csv
+import itertools
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Iterator, Optional, Union
+import torch
+from PIL import Image
+
+try:
+    from .wcoh_convert import pil2tensor, tensor2pil
+    from .wcoh_font_manifest import font_manifest
+    from .wcoh_mask_overlay import wcoh_mask_overlay
+    from .wcoh_profile import instrument, stage
+    from .wcoh_text_blocks import parse_blocks, wcoh_text_blocks
+except ImportError:
+    from wcoh_convert import pil2tensor, tensor2pil
+    from wcoh_font_manifest import font_manifest
+    from wcoh_mask_overlay import wcoh_mask_overlay
+    from wcoh_profile import instrument, stage
+    from wcoh_text_blocks import parse_blocks, wcoh_text_blocks
+
+FORMATS = ["png", "webp"]
+DEFAULT_TEMPLATE = json.dumps([
+    {"text": "{team}", "font": "Jalnan2TTF", "font_size": 60, "position_y": 80},
+    {"text": "{name}", "font_size": 48, "position_y": 200},
+], ensure_ascii=False, indent=2)
+
+
+def read_rows(path: str) -> Iterator[dict]:
+    # CSV(헤더 필수) 또는 JSONL 을 한 줄씩 읽는다 (전체를 메모리에 올리지 않음)
+    path = Path(path)
+    with open(path, encoding="utf-8-sig", newline="") as f:
+        if path.suffix.lower() in (".jsonl", ".ndjson"):
+            for line_number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                row = json.loads(line)
+                if not isinstance(row, dict):
+                    raise ValueError(f"{path}:{line_number} 행이 객체가 아닙니다")
+                yield row
+        else:
+            yield from csv.DictReader(f)
+
+
+def row_values(row: dict, index: int) -> dict:
+    # {index} 는 0부터 시작하는 행 번호로 예약된 이름이라 같은 이름의 열은 받지 않는다
+    if "index" in row:
+        raise ValueError(f"{index}번째 행: 'index' 열 이름은 행 번호용으로 예약되어 있습니다. 다른 이름을 사용하세요")
+    return {**row, "index": index}
+
+
+def fill_blocks(template: list[dict], row: dict, index: int) -> list[dict]:
+    # 블록 text 의 {column} 자리를 행 값으로 채운다. {index} 는 0부터 시작하는 행 번호
+    values = row_values(row, index)
+    try:
+        return [{**block, "text": str(block["text"]).format_map(values)} for block in template]
+    except (KeyError, IndexError, ValueError) as e:
+        raise ValueError(f"{index}번째 행으로 템플릿을 채울 수 없습니다: {e!r}") from e
+
+
+def output_name(pattern: str, row: dict, index: int, fmt: str) -> str:
+    try:
+        name = pattern.format_map(row_values(row, index))
+    except (KeyError, IndexError, ValueError) as e:
+        raise ValueError(f"{index}번째 행으로 파일 이름을 만들 수 없습니다: {e!r}") from e
+    # 경로 구분자는 파일 이름에 쓰지 않는다
+    return f"{name.replace('/', '_').replace(chr(92), '_')}.{fmt}"
+
+
+class AsyncImageWriter:
+    """완성된 프레임을 백그라운드 스레드에서 저장. 대기 중인 프레임 수를 max_pending 으로 제한한다."""
+
+    def __init__(self, workers: int = 2, max_pending: int = 8):
+        self._pool = ThreadPoolExecutor(max_workers=max(workers, 1), thread_name_prefix="wcoh_writer")
+        self._slots = threading.BoundedSemaphore(max(max_pending, 1))
+        self._futures = []
+        self.written = 0
+
+    def _save(self, image: Image.Image, path: Path, fmt: str, quality: int):
+        try:
+            if fmt == "webp":
+                image.save(path, "WEBP", quality=quality, method=4)
+            else:
+                image.save(path, "PNG", compress_level=4)
+        finally:
+            self._slots.release()
+
+    def submit(self, image: Image.Image, path: Path, fmt: str = "png", quality: int = 90):
+        # 슬롯이 빌 때까지 기다려 렌더링이 저장보다 앞서 나가도 메모리가 늘지 않게 한다
+        self._slots.acquire()
+        pending = []
+        for future in self._futures:
+            if future.done():
+                future.result()  # 저장 실패는 다음 제출 시점에 바로 알린다
+            else:
+                pending.append(future)
+        self._futures = pending
+        self._futures.append(self._pool.submit(self._save, image, path, fmt, quality))
+        self.written += 1
+
+    def close(self):
+        self._pool.shutdown(wait=True)
+        for future in self._futures:
+            future.result()
+
+
+def run_pipeline(background: torch.Tensor, rows, template, output_dir: str, selected_font: str = "",
+                 filename: str = "{index:05d}", fmt: str = "png", batch: int = 8, quality: int = 90,
+                 overlay: Union[torch.Tensor, str, None] = None, overlay_scale: float = 1.0, overlay_x: int = 0,
+                 overlay_y: int = 0, writers: int = 2) -> int:
+    """rows 를 batch 행씩 렌더링해 output_dir 에 저장하고 저장한 파일 수를 반환한다.
+
+    한 번에 메모리에 있는 프레임은 렌더링 중인 batch 장과 저장 대기 중인 batch * 2 장뿐이다.
+    overlay 는 IMAGE 텐서 또는 이미지 파일 경로다.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"지원하지 않는 이미지 형식입니다: {fmt}")
+    template = parse_blocks(template)
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    text_node = wcoh_text_blocks()
+    if not text_node.fonts:
+        text_node.CACHE_FONTS()
+    overlay_node = wcoh_mask_overlay()
+    writer = AsyncImageWriter(writers, max_pending=max(batch, 1) * 2)
+    background = background[:1]
+
+    numbered = enumerate(rows)
+    try:
+        while True:
+            chunk = list(itertools.islice(numbered, max(batch, 1)))
+            if not chunk:
+                break
+            blocks = [fill_blocks(template, row, index) for index, row in chunk]
+            frames, = text_node.add_text_blocks(background, blocks, selected_font)
+            if overlay is not None:
+                if isinstance(overlay, torch.Tensor):
+                    frames = overlay_node.apply_mask_overlay_torch(frames, overlay, overlay_scale, overlay_x, overlay_y)
+                else:
+                    frames = overlay_node.apply_mask_overlay_torch(frames, None, overlay_scale, overlay_x, overlay_y, overlay)
+            for frame, (index, row) in zip(frames, chunk):
+                with stage("convert"):
+                    image = tensor2pil(frame)
+                writer.submit(image, output_dir / output_name(filename, row, index, fmt), fmt, quality)
+            del frames
+    finally:
+        writer.close()
+    return writer.written
+
+
+class wcoh_template_fill:
+    fonts = wcoh_text_blocks.fonts
+
+    def __init__(self):
+        pass
+
+    @classmethod
+    def INPUT_TYPES(cls):
+        if not cls.fonts:
+            wcoh_text_blocks.CACHE_FONTS()
+        default_font = "LG_Smart_UI-SemiBold" if "LG_Smart_UI-SemiBold" in cls.fonts else next(iter(cls.fonts.keys()), "")
+        return {
+            "required": {
+                "background": ("IMAGE", ),  # 배경 이미지 (첫 장 사용)
+                "rows_path": ("STRING", {"default": "rows.csv"}),  # CSV 또는 JSONL 경로
+                "blocks": ("STRING", {"default": DEFAULT_TEMPLATE, "multiline": True}),  # {column} 자리표시자가 있는 텍스트 블록 JSON
+                "selected_font": ((sorted(cls.fonts.keys())), {"default": default_font}),  # font 를 생략한 블록의 폰트
+                "output_dir": ("STRING", {"default": "output/wcoh_template_fill"}),  # 저장 폴더
+                "filename": ("STRING", {"default": "{index:05d}"}),  # 파일 이름 템플릿 (확장자 제외, {index} 는 행 번호로 예약)
+                "format": (FORMATS, {"default": "png"}),  # 저장 형식
+                "batch": ("INT", {"default": 8, "min": 1, "max": 256, "step": 1}),  # 한 번에 렌더링할 행 수
+            },
+            "optional": {
+                "overlay": ("IMAGE", ),  # 로고 등 오버레이 이미지
+                "overlay_scale": ("FLOAT", {"default": 1.0, "min": 0.1, "max": 10.0, "step": 0.1}),
+                "overlay_x": ("INT", {"default": 0, "min": -5000, "max": 5000, "step": 1}),
+                "overlay_y": ("INT", {"default": 0, "min": -5000, "max": 5000, "step": 1}),
+                "quality": ("INT", {"default": 90, "min": 1, "max": 100, "step": 1}),  # WebP 품질
+            }
+        }
+
+    RETURN_TYPES = ("STRING",)
+    RETURN_NAMES = ("output_dir",)
+    FUNCTION = "fill_templates"
+    OUTPUT_NODE = True
+    CATEGORY = "wcoh_korean_func/text_on_image"
+
+    @instrument("wcoh_template_fill.fill_templates")
+    def fill_templates(self, background: torch.Tensor, rows_path: str, blocks: str, selected_font: str, output_dir: str,
+                       filename: str, format: str, batch: int, overlay: Optional[torch.Tensor] = None,
+                       overlay_scale: float = 1.0, overlay_x: int = 0, overlay_y: int = 0, quality: int = 90):
+        written = run_pipeline(background, read_rows(rows_path), blocks, output_dir, selected_font, filename, format, batch,
+                               quality, overlay, overlay_scale, overlay_x, overlay_y)
+        print(f"wcoh_template_fill: {written}개 이미지 저장 → {output_dir}")
+        return (output_dir,)
+
+
+def load_image(path: str) -> torch.Tensor:
+    with Image.open(path) as image:
+        return pil2tensor(image)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="CSV/JSONL 행마다 텍스트 블록을 채워 이미지를 일괄 생성 (ComfyUI 없이 실행)")
+    parser.add_argument("--background", required=True, help="배경 이미지 경로")
+    parser.add_argument("--rows", required=True, help="CSV(헤더 필수) 또는 JSONL 경로. index 열 이름은 행 번호용으로 예약")
+    parser.add_argument("--blocks", required=True, help="텍스트 블록 템플릿 JSON 파일 또는 JSON 문자열")
+    parser.add_argument("--output", required=True, help="저장 폴더")
+    parser.add_argument("--font", default="", help="font 를 생략한 블록의 폰트 이름")
+    parser.add_argument("--filename", default="{index:05d}", help="파일 이름 템플릿 (확장자 제외, {index} 는 0부터 시작하는 행 번호)")
+    parser.add_argument("--format", choices=FORMATS, default="png")
+    parser.add_argument("--batch", type=int, default=8, help="한 번에 렌더링할 행 수")
+    parser.add_argument("--quality", type=int, default=90, help="WebP 품질")
+    parser.add_argument("--writers", type=int, default=2, help="저장 스레드 수")
+    parser.add_argument("--overlay", help="오버레이 이미지 경로")
+    parser.add_argument("--overlay-scale", type=float, default=1.0)
+    parser.add_argument("--overlay-x", type=int, default=0)
+    parser.add_argument("--overlay-y", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    blocks = Path(args.blocks).read_text(encoding="utf-8") if Path(args.blocks).is_file() else args.blocks
+    wcoh_text_blocks.fonts.update(font_manifest.fonts())
+    font = args.font or ("LG_Smart_UI-SemiBold" if "LG_Smart_UI-SemiBold" in wcoh_text_blocks.fonts
+                         else next(iter(wcoh_text_blocks.fonts), ""))
+    # 오버레이는 경로 그대로 넘겨 overlay_cache 가 디스크에서 바로 읽고 리사이즈하게 한다
+    overlay = args.overlay or None
+    written = run_pipeline(load_image(args.background), read_rows(args.rows), blocks, args.output, font, args.filename,
+                           args.format, args.batch, args.quality, overlay, args.overlay_scale, args.overlay_x,
+                           args.overlay_y, args.writers)
+    print(f"{written}개 이미지 저장 → {args.output}")
+
+
+NODE_CLASS_MAPPINGS = {
+    "wcoh_template_fill": wcoh_template_fill,
+}
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+import json
+from pathlib import Path
+import torch
+
+try:
+    from .wcoh_batch import batch_size, broadcast, expand_batch
+    from .wcoh_composite import alpha_over
+    from .wcoh_font_cache import font_fingerprint, get_font
+    from .wcoh_font_manifest import font_manifest
+    from .wcoh_profile import instrument, record_alloc, stage
+    from .wcoh_text_sprite import caption_sprites
+    from .wcoh_warmup import warmup
+except ImportError:
+    from wcoh_batch import batch_size, broadcast, expand_batch
+    from wcoh_composite import alpha_over
+    from wcoh_font_cache import font_fingerprint, get_font
+    from wcoh_font_manifest import font_manifest
+    from wcoh_profile import instrument, record_alloc, stage
+    from wcoh_text_sprite import caption_sprites
+    from wcoh_warmup import warmup
+
+# 블록에서 생략한 키는 wcoh_text_on_image 의 기본값을 따른다 (font 는 selected_font)
+BLOCK_DEFAULTS = {
+    "text": "",
+    "font": None,
+    "font_size": 40,
+    "color": "white",
+    "shadow_color": "black",
+    "shadow_offset_x": 1,
+    "shadow_offset_y": 1,
+    "shadow_blur": 0,
+    "alignment": "CENTER",
+    "position_y": 0,
+    "x_padding": 0,
+}
+
+DEFAULT_BLOCKS = json.dumps([
+    {"text": "유플러스 팀", "font": "Jalnan2TTF", "font_size": 60, "position_y": 80},
+    {"text": "홍길동", "font_size": 48, "position_y": 200},
+    {"text": "유플러스에서 힘찬 도약을 응원합니다.", "font_size": 32, "position_y": 320},
+], ensure_ascii=False, indent=2)
+
+# 기본 블록이 쓰는 크기를 미리 연다
+warmup.fonts(sorted({BLOCK_DEFAULTS["font_size"], *(block["font_size"] for block in json.loads(DEFAULT_BLOCKS))}))
+
+
+def parse_blocks(blocks) -> list[dict]:
+    # JSON 문자열(또는 이미 파싱된 list/dict)을 기본값이 채워진 블록 리스트로 변환
+    if isinstance(blocks, str):
+        try:
+            blocks = json.loads(blocks) if blocks.strip() else []
+        except json.JSONDecodeError as e:
+            raise ValueError(f"blocks JSON 을 해석할 수 없습니다: {e}") from e
+    if isinstance(blocks, dict):
+        blocks = [blocks]
+    if not isinstance(blocks, list):
+        raise ValueError("blocks 는 텍스트 블록 객체의 리스트여야 합니다")
+    parsed = []
+    for index, block in enumerate(blocks):
+        if not isinstance(block, dict):
+            raise ValueError(f"{index}번째 블록이 객체가 아닙니다: {block!r}")
+        unknown = set(block) - set(BLOCK_DEFAULTS)
+        if unknown:
+            raise ValueError(f"{index}번째 블록에 알 수 없는 키가 있습니다: {', '.join(sorted(unknown))}")
+        parsed.append({**BLOCK_DEFAULTS, **block})
+    return parsed
+
+
+class wcoh_text_blocks:
+    fonts = {}
+
+    def __init__(self):
+        pass
+
+    @classmethod
+    def CACHE_FONTS(cls):
+        # 설정된 폰트 폴더만 훑는 공유 manifest 사용 (재귀 glob 대신)
+        cls.fonts.update(font_manifest.fonts())
+        # 기본 한글 지원 글꼴 설정
+        default_font_path = "/root/app/custom_nodes/wcoh/LG_Smart_UI-SemiBold.ttf"  # 시스템에 설치된 한글 글꼴 경로
+        if Path(default_font_path).exists():
+            cls.fonts["LG_Smart_UI-SemiBold"] = default_font_path
+
+    @classmethod
+    def INPUT_TYPES(cls):
+        if not cls.fonts:
+            cls.CACHE_FONTS()
+        default_font = "LG_Smart_UI-SemiBold" if "LG_Smart_UI-SemiBold" in cls.fonts else next(iter(cls.fonts.keys()), "")
+        return {
+            "required": {
+                "image": ("IMAGE", ),  # 입력 이미지
+                "blocks": ("STRING", {"default": DEFAULT_BLOCKS, "multiline": True}),  # 텍스트 블록 JSON 리스트
+                "selected_font": ((sorted(cls.fonts.keys())), {"default": default_font}),  # font 를 생략한 블록의 폰트
+            }
+        }
+
+    @classmethod
+    def IS_CHANGED(cls, blocks, selected_font, **kwargs):
+        # 입력이 같으면 ComfyUI 캐시를 그대로 쓰고, 블록이 쓰는 폰트 파일이 바뀐 경우에만 다시 실행
+        names = {selected_font}
+        for item in blocks if isinstance(blocks, list) else [blocks]:
+            try:
+                names.update(block["font"] for block in parse_blocks(item) if block["font"])
+            except ValueError:
+                pass  # 잘못된 JSON 은 실행 시점에 오류로 알린다
+        return font_fingerprint(*(cls.fonts.get(name) for name in sorted(names)))
+
+    RETURN_TYPES = ("IMAGE",)
+    RETURN_NAMES = ("image_with_text",)
+    FUNCTION = "add_text_blocks"
+    CATEGORY = "wcoh_korean_func/text_on_image"
+
+    def load_font(self, name, font_size: int, default_font: str):
+        # 블록의 font 오타가 조용히 다른 폰트/기본 비트맵 폰트로 바뀌지 않도록 오류로 알린다
+        name = name or default_font
+        font_path = self.fonts.get(name)
+        if font_path is None:
+            raise ValueError(f"알 수 없는 폰트입니다: {name}")
+        try:
+            return get_font(font_path, font_size)
+        except OSError as e:
+            raise ValueError(f"폰트 {name} 을(를) 열 수 없습니다 ({font_path}): {e}") from e
+
+    def place_blocks(self, blocks: list[dict], image_width: int, default_font: str) -> list[tuple]:
+        # 블록별 (sprite, x, y). 스프라이트는 한 번에 요청해 캐시에 없는 것만 렌더링 워커에 나눠 래스터화
+        with stage("font_load"):
+            fonts = [self.load_font(block["font"], int(block["font_size"]), default_font) for block in blocks]
+        with stage("rasterize"):
+            sprites = caption_sprites((str(block["text"]), font, block["color"], block["shadow_color"],
+                                       int(block["shadow_offset_x"]), int(block["shadow_offset_y"]), float(block["shadow_blur"]))
+                                      for block, font in zip(blocks, fonts))
+        placements = []
+        for block, sprite in zip(blocks, sprites):
+            text_width = sprite.text_width
+            padding = int(block["x_padding"])
+
+            # X 위치 계산
+            alignment = str(block["alignment"]).upper()
+            if alignment == "CENTER":
+                position_x = (image_width - text_width) // 2 + padding
+            elif alignment == "RIGHT":
+                position_x = image_width - text_width - padding
+            else:
+                position_x = padding  # 기본값은 LEFT로 처리
+            placements.append((sprite, position_x + sprite.offset_x, int(block["position_y"]) + sprite.offset_y))
+        return placements
+
+    @staticmethod
+    def draw_placements(target: torch.Tensor, placements: list[tuple]):
+        # target([B,H,W,C]) 의 모든 프레임에 순서대로 합성 (뒤 블록이 위에 그려짐)
+        with stage("paste"):
+            for sprite, x, y in placements:
+                alpha_over(target, sprite.image, x, y, premultiplied=True)
+
+    @instrument("wcoh_text_blocks.add_text_blocks")
+    def add_text_blocks(self, image: torch.Tensor, blocks, selected_font: str):
+        # blocks 는 프레임별 리스트도 받아 브로드캐스트 (Python 호출 전용. 그래프에서는 JSON 문자열 하나)
+        batch = batch_size(image, blocks)
+        items = broadcast(blocks, batch)
+
+        # 출력 배치는 한 번만 복사하고, 블록마다 캐시된 스프라이트를 제자리 합성
+        with stage("convert"):
+            output = expand_batch(image, batch)
+        record_alloc("output", output)
+        image_width = output.shape[2]
+        if all(item == items[0] for item in items):
+            # 모든 프레임이 같은 블록이면 배치 전체에 한 번씩만 합성
+            self.draw_placements(output, self.place_blocks(parse_blocks(items[0]), image_width, selected_font))
+        else:
+            # 프레임별 블록을 한 번에 배치해 서로 다른 스프라이트를 함께 래스터화
+            frames = [parse_blocks(item) for item in items]
+            placements = self.place_blocks([block for blocks in frames for block in blocks], image_width, selected_font)
+            start = 0
+            for index, frame_blocks in enumerate(frames):
+                self.draw_placements(output[index:index + 1], placements[start:start + len(frame_blocks)])
+                start += len(frame_blocks)
+
+        return (output,)
+
+NODE_CLASS_MAPPINGS = {
+    "wcoh_text_blocks": wcoh_text_blocks,
+}
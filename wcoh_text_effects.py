@@ -0,0 +1,44 @@
+import math
+from typing import Sequence
+import torch
+import torch.nn.functional as F
+
+# 가우시안 커널은 sigma 의 3배까지 자른다
+BLUR_TRUNCATE = 3.0
+
+
+def _planes(mask: torch.Tensor) -> torch.Tensor:
+    # [..., H, W] → [N, 1, H, W]
+    return mask.reshape(-1, 1, mask.shape[-2], mask.shape[-1])
+
+
+def blur_radius(sigma: float) -> int:
+    return int(math.ceil(BLUR_TRUNCATE * sigma)) if sigma > 0 else 0
+
+
+def gaussian_blur(mask: torch.Tensor, sigma: float) -> torch.Tensor:
+    """[..., H, W] 마스크를 분리형 가우시안으로 흐리게 한다 (출력은 사방 blur_radius(sigma) 만큼 커짐)."""
+    radius = blur_radius(sigma)
+    if radius == 0:
+        return mask.clone()
+    offsets = torch.arange(-radius, radius + 1, dtype=mask.dtype, device=mask.device)
+    kernel = torch.exp(-(offsets * offsets) / (2.0 * sigma * sigma))
+    kernel /= kernel.sum()
+    planes = F.pad(_planes(mask), (radius, radius, radius, radius))
+    planes = F.conv2d(planes, kernel.view(1, 1, 1, -1), padding=(0, radius))
+    planes = F.conv2d(planes, kernel.view(1, 1, -1, 1), padding=(radius, 0))
+    return planes.clamp_(0.0, 1.0).reshape(*mask.shape[:-2], planes.shape[-2], planes.shape[-1])
+
+
+def compose_layers(layers: Sequence[tuple], height: int, width: int) -> torch.Tensor:
+    """(alpha[h,w], rgb[3], x, y) 레이어들을 뒤→앞 순서로 겹친 premultiplied RGBA [height,width,4]."""
+    out = torch.zeros((height, width, 4), dtype=torch.float32)
+    for alpha, rgb, x, y in layers:
+        h, w = alpha.shape[-2], alpha.shape[-1]
+        a = alpha.to(torch.float32).unsqueeze(-1)
+        region = out[y:y + h, x:x + w]
+        # over: 레이어 색 * 알파 + 기존 * (1 - 알파)
+        region.mul_(1.0 - a)
+        region[..., :3].add_(a * rgb)
+        region[..., 3:].add_(a)
+    return out
@@ -0,0 +1,103 @@
+import os
+import textwrap
+from typing import NamedTuple, Optional
+
+try:
+    from .wcoh_font_cache import font_key
+    from .wcoh_lru import LRUCache
+    from .wcoh_profile import register_cache
+    from .wcoh_shaping import shape_text
+except ImportError:
+    from wcoh_font_cache import font_key
+    from wcoh_lru import LRUCache
+    from wcoh_profile import register_cache
+    from wcoh_shaping import shape_text
+
+LAYOUT_CACHE_SIZE = int(os.environ.get("WCOH_LAYOUT_CACHE_SIZE", "1024"))
+
+
+class TextLayout(NamedTuple):
+    lines: tuple
+    boxes: tuple      # 줄별 shaping 결과의 bbox (font.getbbox(line) 과 같음)
+    offsets_y: tuple  # 첫 줄 기준 각 줄의 y 오프셋 (line_spacing 포함)
+
+    @property
+    def height(self) -> int:
+        if not self.lines:
+            return 0
+        top, bottom = self.boxes[-1][1], self.boxes[-1][3]
+        return self.offsets_y[-1] + bottom - top
+
+
+class LayoutCache:
+    """(text, font, size, width, spacing) 단위로 줄바꿈 결과와 줄 박스를 보관하는 LRU."""
+
+    def __init__(self, max_entries: int = LAYOUT_CACHE_SIZE):
+        self._layouts = LRUCache(max_entries)
+
+    def wrap_pixels(self, text: str, font, max_width: float) -> list[str]:
+        # textwrap 과 같이 공백을 기준으로 나누되, 폭은 글자 수가 아닌 shaping 된 픽셀 폭(커닝 포함)으로 판단
+        space = shape_text(" ", font).width
+        lines: list[str] = []
+        current, current_width = "", 0.0
+        for word in text.split():
+            run = shape_text(word, font)
+            word_width = run.width
+            if current and current_width + space + word_width <= max_width:
+                current += " " + word
+                current_width += space + word_width
+                continue
+            if current:
+                lines.append(current)
+            if word_width <= max_width:
+                current, current_width = word, word_width
+                continue
+            # 한 단어가 폭보다 길면 글자 클러스터 단위로 자른다 (띄어쓰기 없는 한글 문장)
+            current, current_width = "", 0.0
+            for cluster, advance in zip(run.clusters, run.advances):
+                if current and current_width + advance > max_width:
+                    lines.append(current)
+                    current, current_width = "", 0.0
+                current += cluster
+                current_width += advance
+        if current:
+            lines.append(current)
+        return lines
+
+    def layout(self, text: str, font, max_width: Optional[float] = None, wrap: int = 0, line_spacing: int = 0) -> TextLayout:
+        key = (text, font_key(font), max_width, wrap, line_spacing)
+        layout = self._layouts.get(key)
+        if layout is not None:
+            return layout
+
+        if wrap > 0:
+            lines = textwrap.wrap(text, width=wrap)
+        elif max_width is not None:
+            lines = self.wrap_pixels(text, font, max_width)
+        else:
+            lines = [text]
+        boxes, offsets_y = [], []
+        y = 0
+        for line in lines:
+            box = shape_text(line, font).bbox
+            boxes.append(box)
+            offsets_y.append(y)
+            y += box[3] - box[1] + line_spacing
+        layout = TextLayout(tuple(lines), tuple(boxes), tuple(offsets_y))
+
+        self._layouts.put(key, layout)
+        return layout
+
+    def clear(self):
+        self._layouts.clear()
+
+    def stats(self) -> dict:
+        return self._layouts.stats()
+
+
+layout_cache = LayoutCache()
+register_cache("layout", layout_cache.stats)
+
+
+def layout_text(text: str, font, max_width: Optional[float] = None, wrap: int = 0, line_spacing: int = 0) -> TextLayout:
+    return layout_cache.layout(text, font, max_width, wrap, line_spacing)
@@ -1,15 +1,28 @@
 from pathlib import Path
-from typing import Union
-import numpy as np
 import torch
-from PIL import Image, ImageDraw, ImageFont
+from PIL import ImageFont
 
-def pil2tensor(image: Image.Image) -> torch.Tensor:
-    return torch.from_numpy(np.array(image).astype(np.float32) / 255.0).unsqueeze(0)
+try:
+    from .wcoh_batch import batch_size, broadcast, expand_batch
+    from .wcoh_composite import alpha_over
+    from .wcoh_font_cache import font_fingerprint, get_font
+    from .wcoh_font_manifest import font_manifest
+    from .wcoh_profile import instrument, record_alloc, stage
+    from .wcoh_text_sprite import caption_sprites
+    from .wcoh_warmup import warmup
+except ImportError:
+    from wcoh_batch import batch_size, broadcast, expand_batch
+    from wcoh_composite import alpha_over
+    from wcoh_font_cache import font_fingerprint, get_font
+    from wcoh_font_manifest import font_manifest
+    from wcoh_profile import instrument, record_alloc, stage
+    from wcoh_text_sprite import caption_sprites
+    from wcoh_warmup import warmup
+
+DEFAULT_FONT_SIZE = 40
+# 첫 실행이 폰트 파싱을 기다리지 않도록 기본 폰트/크기를 미리 연다
+warmup.fonts([DEFAULT_FONT_SIZE], "LG_Smart_UI-SemiBold")
 
-def tensor2pil(tensor: torch.Tensor) -> Image.Image:
-    image = (tensor.squeeze(0).numpy() * 255).astype(np.uint8)
-    return Image.fromarray(image)
 
 class wcoh_text_on_image:
     fonts = {}
@@ -19,12 +32,8 @@ class wcoh_text_on_image:
 
     @classmethod
     def CACHE_FONTS(cls):
-        font_extensions = ["*.ttf", "*.otf", "*.woff", "*.woff2", "*.eot"]
-        fonts = []
-        for extension in font_extensions:
-            fonts.extend(Path(".").glob(f"**/{extension}"))
-        for font in fonts:
-            cls.fonts[font.stem] = font.as_posix()
+        # 설정된 폰트 폴더만 훑는 공유 manifest 사용 (재귀 glob 대신)
+        cls.fonts.update(font_manifest.fonts())
         # 기본 한글 지원 글꼴 설정
         default_font_path = "/root/app/custom_nodes/wcoh/LG_Smart_UI-SemiBold.ttf"  # 시스템에 설치된 한글 글꼴 경로
         if Path(default_font_path).exists():
@@ -38,61 +47,80 @@ class wcoh_text_on_image:
         return {
             "required": {
                 "image": ("IMAGE", ),  # 입력 이미지
-                "text": ("STRING", {"default": "유플러스에서 힘찬 도약을 응원합니다."}),  # 추가할 텍스트
+                "text": ("STRING", {"default": "유플러스에서 힘찬 도약을 응원합니다.", "multiline": True}),  # 추가할 텍스트
                 "selected_font": ((sorted(cls.fonts.keys())), {"default": default_font}),  # 선택 가능한 폰트
-                "font_size": ("INT", {"default": 40, "min": 10, "max": 200, "step": 1}),  # 글씨 크기
+                "font_size": ("INT", {"default": DEFAULT_FONT_SIZE, "min": 10, "max": 200, "step": 1}),  # 글씨 크기
                 "color": ("COLOR", {"default": "white"}),  # 텍스트 색상
                 "shadow_color": ("COLOR", {"default": "black"}),  # 그림자 색상
                 "shadow_offset_x": ("INT", {"default": 1, "min": -100, "max": 100, "step": 1}),  # 그림자 X 오프셋
                 "shadow_offset_y": ("INT", {"default": 1, "min": -100, "max": 100, "step": 1}),  # 그림자 Y 오프셋
                 "alignment": (["LEFT", "CENTER", "RIGHT"], {"default": "CENTER"}),  # X축 정렬
                 "position_y": ("INT", {"default": 1150, "min": 0, "max": 5000, "step": 1}),  # Y 좌표
+            },
+            "optional": {
+                "shadow_blur": ("FLOAT", {"default": 0.0, "min": 0.0, "max": 50.0, "step": 0.5}),  # 그림자 가우시안 블러 (sigma)
+                "split_lines": ("BOOLEAN", {"default": False}),  # text 의 각 줄을 배치 항목별 텍스트로 사용
             }
         }
 
+    @classmethod
+    def IS_CHANGED(cls, selected_font, **kwargs):
+        # 입력이 같으면 ComfyUI 캐시를 그대로 쓰고, 폰트 파일이 바뀐 경우에만 다시 실행
+        return font_fingerprint(cls.fonts.get(selected_font, cls.fonts.get("LG_Smart_UI-SemiBold")))
+
     RETURN_TYPES = ("IMAGE",)
     RETURN_NAMES = ("image_with_text",)
     FUNCTION = "add_text_to_image"
     CATEGORY = "wcoh_korean_func/text_on_image"
 
+    @instrument("wcoh_text_on_image.add_text_to_image")
     def add_text_to_image(self, image: torch.Tensor, text: str, selected_font: str, font_size: int, color: str,
                           shadow_color: str, shadow_offset_x: int, shadow_offset_y: int,
-                          alignment: str, position_y: int):
-        # PyTorch Tensor를 PIL 이미지로 변환
-        pil_image = tensor2pil(image)
-        draw = ImageDraw.Draw(pil_image)
+                          alignment: str, position_y: int, shadow_blur: float = 0.0, split_lines: bool = False):
+        # [B,H,W,C] 배치 처리: split_lines 면 text 의 줄마다 한 항목. 길이 1 인 값은 배치 전체에 브로드캐스트
+        # (position_y 리스트는 ComfyUI 가 노드를 항목마다 따로 부르므로 Python 에서 호출할 때만 쓸 수 있다)
+        if split_lines and isinstance(text, str):
+            text = text.splitlines() or [""]
+        batch = batch_size(image, text, position_y)
+        texts = broadcast(text, batch)
+        positions_y = broadcast(position_y, batch)
 
-        # 선택된 폰트 로드
+        # 선택된 폰트 로드 (배치 전체에서 공유)
         font_path = self.fonts.get(selected_font, self.fonts.get("LG_Smart_UI-SemiBold"))
-        try:
-            font = ImageFont.truetype(font_path, font_size)
-        except IOError:
-            font = ImageFont.load_default()
-
-        # 텍스트 크기 계산
-        text_bbox = font.getbbox(text)  # (left, top, right, bottom)
-        text_width = text_bbox[2] - text_bbox[0]
-
-        # X 위치 계산
-        image_width, _ = pil_image.size
-        if alignment == "LEFT":
-            position_x = 0
-        elif alignment == "CENTER":
-            position_x = (image_width - text_width) // 2
-        elif alignment == "RIGHT":
-            position_x = image_width - text_width
-        else:
-            position_x = 0  # 기본값은 LEFT로 처리
-
-        # 그림자 추가
-        shadow_position = (position_x + shadow_offset_x, position_y + shadow_offset_y)
-        draw.text(shadow_position, text, fill=shadow_color, font=font)
-
-        # 텍스트 추가
-        draw.text((position_x, position_y), text, fill=color, font=font)
-
-        # PIL 이미지를 PyTorch Tensor로 변환
-        return (pil2tensor(pil_image),)
+        with stage("font_load"):
+            try:
+                font = get_font(font_path, font_size)
+            except IOError:
+                font = ImageFont.load_default()
+
+        # 출력 배치는 한 번만 복사하고, 각 프레임에는 캐시된 캡션 스프라이트를 한 번씩 합성
+        with stage("convert"):
+            output = expand_batch(image, batch)
+        record_alloc("output", output)
+        image_width = output.shape[2]
+        # 그림자 + 텍스트를 한 번만 래스터화한 스프라이트 (텍스트/스타일이 같으면 재사용).
+        # 캐시에 없는 서로 다른 텍스트는 렌더링 워커에 나눠 래스터화
+        with stage("rasterize"):
+            sprites = caption_sprites((item_text, font, color, shadow_color, shadow_offset_x, shadow_offset_y, shadow_blur)
+                                      for item_text in texts)
+        for index, (item_y, sprite) in enumerate(zip(positions_y, sprites)):
+            text_width = sprite.text_width
+
+            # X 위치 계산
+            if alignment == "LEFT":
+                position_x = 0
+            elif alignment == "CENTER":
+                position_x = (image_width - text_width) // 2
+            elif alignment == "RIGHT":
+                position_x = image_width - text_width
+            else:
+                position_x = 0  # 기본값은 LEFT로 처리
+
+            with stage("paste"):
+                alpha_over(output[index:index + 1], sprite.image, position_x + sprite.offset_x, item_y + sprite.offset_y,
+                           premultiplied=True)
+
+        return (output,)
 
 NODE_CLASS_MAPPINGS = {
     "wcoh_text_on_image": wcoh_text_on_image,
@@ -0,0 +1,139 @@
+import os
+from typing import NamedTuple
+import numpy as np
+import torch
+from PIL import ImageColor
+
+try:
+    from .wcoh_coverage import coverage_mask
+    from .wcoh_executor import render_map
+    from .wcoh_font_cache import font_key, get_font
+    from .wcoh_lru import LRUCache
+    from .wcoh_profile import register_cache
+    from .wcoh_text_effects import blur_radius, compose_layers, gaussian_blur
+except ImportError:
+    from wcoh_coverage import coverage_mask
+    from wcoh_executor import render_map
+    from wcoh_font_cache import font_key, get_font
+    from wcoh_lru import LRUCache
+    from wcoh_profile import register_cache
+    from wcoh_text_effects import blur_radius, compose_layers, gaussian_blur
+
+SPRITE_CACHE_BYTES = int(float(os.environ.get("WCOH_SPRITE_CACHE_MB", "256")) * 1024 * 1024)
+
+
+class CaptionSprite(NamedTuple):
+    image: torch.Tensor  # [h,w,4] premultiplied RGBA
+    offset_x: int        # draw.text 기준점에서 스프라이트 좌상단까지의 거리
+    offset_y: int
+    text_width: int      # font.getbbox(text) 폭 (정렬 계산용)
+
+    @property
+    def nbytes(self) -> int:
+        return self.image.element_size() * self.image.nelement()
+
+
+def _rgb(color) -> torch.Tensor:
+    # RGB 프레임에 그리는 draw.text 와 같이 색상의 알파는 무시한다
+    return torch.tensor(ImageColor.getrgb(color)[:3], dtype=torch.float32) / 255.0
+
+
+def text_mask(text: str, font):
+    # 커버리지 마스크는 색/그림자와 따로 캐시되므로 색이나 오프셋만 바뀌면 다시 래스터화하지 않는다
+    coverage = coverage_mask(text, font)
+    return np.asarray(coverage.mask, dtype=np.float32) / 255.0, coverage.left, coverage.top, coverage.width
+
+
+def render_caption(text: str, font, color, shadow_color, shadow_offset_x: int, shadow_offset_y: int,
+                   shadow_blur: float = 0) -> CaptionSprite:
+    # 하나의 커버리지 마스크에서 그림자(이동 + 선택적 가우시안 블러) → 본문 순서로 premultiplied RGBA 한 장을 만든다
+    mask, left, top, text_width = text_mask(text, font)
+    fill = torch.from_numpy(mask)
+    shadow = gaussian_blur(fill, shadow_blur) if shadow_blur > 0 else fill
+    spread = blur_radius(shadow_blur) if shadow_blur > 0 else 0
+    height, width = fill.shape
+    shadow_x, shadow_y = shadow_offset_x - spread, shadow_offset_y - spread
+    origin_x, origin_y = min(0, shadow_x), min(0, shadow_y)
+    sprite_w = max(width, shadow_x + shadow.shape[1]) - origin_x
+    sprite_h = max(height, shadow_y + shadow.shape[0]) - origin_y
+
+    sprite = compose_layers([
+        (shadow, _rgb(shadow_color), shadow_x - origin_x, shadow_y - origin_y),
+        (fill, _rgb(color), -origin_x, -origin_y),
+    ], sprite_h, sprite_w)
+    return CaptionSprite(sprite, left + origin_x, top + origin_y, text_width)
+
+
+def font_spec(font):
+    # 프로세스 워커에는 폰트 객체 대신 (path, size, variation) 을 넘겨 워커의 폰트 캐시에서 다시 연다.
+    # load_default() 처럼 파일 경로가 없는 폰트(path 가 BytesIO 등)는 객체 그대로 두고 현재 프로세스에서 그린다
+    if not isinstance(getattr(font, "path", None), (str, os.PathLike)):
+        return font
+    return (font.path, font.size, getattr(font, "wcoh_variation", None))
+
+
+def _render_task(args) -> CaptionSprite:
+    spec, text, color, shadow_color, shadow_offset_x, shadow_offset_y, shadow_blur = args
+    font = get_font(*spec) if isinstance(spec, tuple) else spec
+    return render_caption(text, font, color, shadow_color, shadow_offset_x, shadow_offset_y, shadow_blur)
+
+
+class SpriteCache:
+    """텍스트/스타일 파라미터 단위로 렌더링된 캡션 스프라이트를 보관하는 바이트 상한 LRU."""
+
+    def __init__(self, max_bytes: int = SPRITE_CACHE_BYTES):
+        self._sprites = LRUCache(max_bytes=max_bytes, cost=lambda sprite: sprite.nbytes)
+
+    def get(self, text: str, font, color, shadow_color, shadow_offset_x: int, shadow_offset_y: int,
+            shadow_blur: float = 0) -> CaptionSprite:
+        key = (text, font_key(font), color, shadow_color, shadow_offset_x, shadow_offset_y, shadow_blur)
+        sprite = self._sprites.get(key)
+        if sprite is None:
+            sprite = render_caption(text, font, color, shadow_color, shadow_offset_x, shadow_offset_y, shadow_blur)
+            self._sprites.put(key, sprite)
+        return sprite
+
+    def get_many(self, requests) -> list[CaptionSprite]:
+        # requests: (text, font, color, shadow_color, shadow_offset_x, shadow_offset_y, shadow_blur) 목록.
+        # 캐시에 없는 고유 스프라이트만 render_map 으로 나눠 래스터화하고 요청 순서대로 반환
+        requests = list(requests)
+        keys = [(text, font_key(font), *style) for text, font, *style in requests]
+        found: dict[tuple, CaptionSprite] = {}
+        missing: dict[tuple, tuple] = {}
+        for key, (text, font, *style) in zip(keys, requests):
+            if key in found or key in missing:
+                continue
+            sprite = self._sprites.get(key)
+            if sprite is not None:
+                found[key] = sprite
+            else:
+                missing[key] = (font_spec(font), text, *style)
+        if missing:
+            # 경로로 다시 열 수 없는 폰트는 워커에 넘기지 않고 여기서 그린다
+            local = [key for key, task in missing.items() if not isinstance(task[0], tuple)]
+            remote = [key for key, task in missing.items() if isinstance(task[0], tuple)]
+            sprites = [_render_task(missing[key]) for key in local]
+            sprites += render_map(_render_task, [missing[key] for key in remote])
+            for key, sprite in zip(local + remote, sprites):
+                found[key] = sprite
+                self._sprites.put(key, sprite)
+        return [found[key] for key in keys]
+
+    def clear(self):
+        self._sprites.clear()
+
+    def stats(self) -> dict:
+        return self._sprites.stats()
+
+
+sprite_cache = SpriteCache()
+register_cache("caption_sprite", sprite_cache.stats)
+
+
+def caption_sprite(text: str, font, color, shadow_color, shadow_offset_x: int = 0, shadow_offset_y: int = 0,
+                   shadow_blur: float = 0) -> CaptionSprite:
+    return sprite_cache.get(text, font, color, shadow_color, shadow_offset_x, shadow_offset_y, shadow_blur)
+
+
+def caption_sprites(requests) -> list[CaptionSprite]:
+    return sprite_cache.get_many(requests)
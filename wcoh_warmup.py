@@ -0,0 +1,120 @@
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Iterable, Optional
+
+try:
+    from .wcoh_font_cache import font_cache
+    from .wcoh_font_manifest import font_manifest
+    from .wcoh_image_pool import folder_index
+    from .wcoh_profile import register_cache
+except ImportError:
+    from wcoh_font_cache import font_cache
+    from wcoh_font_manifest import font_manifest
+    from wcoh_image_pool import folder_index
+    from wcoh_profile import register_cache
+
+# WCOH_WARMUP=0 이면 import 시점 warm-up 을 하지 않는다
+WARMUP_ENABLED = os.environ.get("WCOH_WARMUP", "1").lower() not in ("", "0", "false", "no")
+# 노드 기본 폴더 외에 미리 색인할 이미지 폴더 (os.pathsep 구분)
+WARMUP_FOLDERS = [d for d in os.environ.get("WCOH_WARMUP_FOLDERS", "").split(os.pathsep) if d]
+PREFERRED_FONT = "LG_Smart_UI-SemiBold"
+
+
+class Warmup:
+    """노드 모듈 import 시점에 폰트 파싱과 이미지 폴더 색인을 백그라운드 스레드 하나로 미리 해 둔다.
+
+    요청만 큐에 넣고 바로 돌아오므로 시작 시간이 늘지 않는다. 실행 중인 노드는 각 캐시의
+    single-flight 로드 덕분에 자신이 쓰는 폰트가 로드 중이면 그것만 기다린다.
+    """
+
+    def __init__(self, enabled: bool = WARMUP_ENABLED):
+        self.enabled = enabled
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._futures: list[Future] = []
+        self._fonts: set[tuple] = set()
+        self._folders: set[str] = set()
+        self._lock = threading.Lock()
+        self.fonts_loaded = 0
+        self.folders_indexed = 0
+        self.errors = 0
+
+    def _submit(self, fn, *args) -> Optional[Future]:
+        if not self.enabled:
+            return None
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="wcoh_warmup")
+            future = self._executor.submit(fn, *args)
+            self._futures = [f for f in self._futures if not f.done()] + [future]
+        return future
+
+    def fonts(self, sizes: Iterable[int], preferred: str = PREFERRED_FONT) -> Optional[Future]:
+        """manifest 의 폰트를 sizes 크기로 미리 연다 (preferred 폰트부터 열고, 끝나면 가장 최근 사용으로 옮긴다)."""
+        return self._submit(self._warm_fonts, [int(size) for size in sizes], preferred)
+
+    def folders(self, paths: Iterable[str]) -> Optional[Future]:
+        """이미지 폴더 목록을 미리 읽어 folder_index 에 넣는다 (없는 폴더는 건너뜀)."""
+        return self._submit(self._warm_folders, [os.fspath(path) for path in [*paths, *WARMUP_FOLDERS]])
+
+    def _warm_fonts(self, sizes: list[int], preferred: str):
+        fonts = font_manifest.fonts()
+        names = sorted(fonts, key=lambda name: (name != preferred, name))
+        try:
+            for size in sizes:
+                for name in names:
+                    key = (fonts[name], size)
+                    with self._lock:
+                        if key in self._fonts:
+                            continue
+                        self._fonts.add(key)
+                    if font_cache.full():
+                        return
+                    try:
+                        font_cache.get(fonts[name], size)
+                    except (OSError, ValueError) as e:
+                        self.errors += 1
+                        print(f"[wcoh] warm-up 폰트 로드 실패 ({name}, {size}): {e}")
+                        continue
+                    self.fonts_loaded += 1
+        finally:
+            # 먼저 연 preferred 폰트가 뒤이은 폰트들 때문에 LRU 끝에서 먼저 밀려나지 않도록 한다
+            if preferred in fonts:
+                for size in sizes:
+                    font_cache.touch(fonts[preferred], size)
+
+    def _warm_folders(self, paths: list[str]):
+        for path in paths:
+            with self._lock:
+                if path in self._folders:
+                    continue
+                self._folders.add(path)
+            if not os.path.isdir(path):
+                continue
+            try:
+                folder_index.files(path)
+            except OSError as e:
+                self.errors += 1
+                print(f"[wcoh] warm-up 폴더 색인 실패 ({path}): {e}")
+                continue
+            self.folders_indexed += 1
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        # 벤치마크/CLI 에서 warm-up 이 끝날 때까지 기다릴 때 사용
+        with self._lock:
+            futures = list(self._futures)
+        return not wait(futures, timeout=timeout).not_done
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "pending": sum(not f.done() for f in self._futures),
+                "fonts_loaded": self.fonts_loaded,
+                "folders_indexed": self.folders_indexed,
+                "errors": self.errors,
+            }
+
+
+warmup = Warmup()
+register_cache("warmup", warmup.stats)